@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the AIRS-GSeed data generators, models and pipeline.
+
+    python benchmarks/run.py --help
+"""
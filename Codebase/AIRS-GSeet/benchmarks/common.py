@@ -0,0 +1,142 @@
+"""
+Timing, process isolation and baseline comparison shared by the benchmark suites.
+
+Every benchmark case is a module-level function returning a dict of metrics.
+``run_case`` runs it in a freshly spawned process, so thread settings and
+caches of one case never leak into the next. ``base_rss_mb`` is the RSS of
+that process once the case's module (e.g. torch) is loaded, and
+``peak_rss_mb`` how far the case itself raised the peak RSS above it.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Metric -> direction in which it improves; anything else is informational
+COMPARED_METRICS = {
+    'samples_per_s': 'higher',
+    'seconds': 'lower',
+    'peak_rss_mb': 'lower',
+    'peak_alloc_mb': 'lower',
+}
+
+
+def time_call(fn, repeats=3, warmup=1):
+    """Median wall-clock seconds of ``fn()`` over ``repeats`` calls after ``warmup`` calls."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def rss_mb(field='VmRSS'):
+    """Current (``'VmRSS'``) or peak (``'VmHWM'``) resident set size of this process in MB.
+
+    Read from /proc on Linux. Elsewhere this falls back to ``ru_maxrss``, which
+    is always the peak and, after fork/exec, includes the parent's.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def reset_peak_rss():
+    """Reset this process's peak RSS to its current RSS, where the kernel allows it (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def run_case(fn, kwargs, isolate=True):
+    """Run one benchmark case and add the RSS it took on top of the process it ran in."""
+    if not isolate:
+        return _measured(fn, kwargs)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measured, fn, kwargs).result()
+
+
+def environment():
+    """Library versions and hardware the results were measured on."""
+    import numpy as np
+    import torch
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'torch': torch.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save_results(path, results):
+    """Write ``{'environment': ..., 'results': {case: metrics}}`` as JSON."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare_results(results, baseline, tolerance=0.10):
+    """Rows comparing every COMPARED_METRICS value present in both runs.
+
+    ``change`` is the relative change in the metric's improving direction
+    (positive is better); a row is a regression when it is below -``tolerance``.
+    """
+    rows = []
+    for case in sorted(set(results) & set(baseline)):
+        for metric, direction in COMPARED_METRICS.items():
+            if metric not in results[case] or metric not in baseline[case]:
+                continue
+            current, previous = results[case][metric], baseline[case][metric]
+            if not previous:
+                continue
+            change = (current - previous) / previous
+            if direction == 'lower':
+                change = -change
+            rows.append({
+                'case': case,
+                'metric': metric,
+                'baseline': previous,
+                'current': current,
+                'change': change,
+                'regression': change < -tolerance,
+            })
+    return rows
+
+
+def _measured(fn, kwargs):
+    base = rss_mb('VmRSS')
+    reset_peak_rss()
+    metrics = fn(**kwargs)
+    metrics['base_rss_mb'] = base
+    metrics['peak_rss_mb'] = max(rss_mb('VmHWM') - base, 0.0)
+    return metrics
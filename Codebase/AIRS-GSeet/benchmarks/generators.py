@@ -0,0 +1,62 @@
+"""
+Throughput and memory of every ``DataGenerator.generate_*`` method.
+
+Samples are the rows of what a method returns: images, spectra or
+DataFrame records. ``peak_alloc_mb`` is the tracemalloc peak of one call,
+which includes NumPy buffers.
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.common import time_call
+from src.data.data_generator import DataGenerator
+
+
+# case -> (method, keyword arguments, keyword arguments with --quick)
+GENERATOR_CASES = {
+    'uav_rgb': ('generate_uav_rgb', dict(n_images=64), dict(n_images=16)),
+    'multispectral': ('generate_multispectral', dict(n_images=128), dict(n_images=32)),
+    'thermal': ('generate_thermal', dict(n_images=512), dict(n_images=128)),
+    'soil_sensor_data': ('generate_soil_sensor_data', dict(n_days=100), dict(n_days=20)),
+    'hyperspectral_seed': ('generate_hyperspectral_seed', dict(n_samples=2000), dict(n_samples=500)),
+    'hyperspectral_seed_float32': ('generate_hyperspectral_seed', dict(n_samples=2000, dtype=np.float32),
+                                   dict(n_samples=500, dtype=np.float32)),
+    'storage_iot': ('generate_storage_iot', dict(n_days=90), dict(n_days=20)),
+    'weather_data': ('generate_weather_data', dict(n_days=3650), dict(n_days=365)),
+    'parallel_hyperspectral_seed': ('generate_parallel', dict(modality='hyperspectral_seed', n=2000),
+                                    dict(modality='hyperspectral_seed', n=500)),
+}
+
+
+def generator_cases(quick=False):
+    """``(name, fn, kwargs)`` for every generator case."""
+    return [(f'generator/{name}', bench_generator, dict(method=method, kwargs=quick_kwargs if quick else kwargs))
+            for name, (method, kwargs, quick_kwargs) in GENERATOR_CASES.items()]
+
+
+def bench_generator(method, kwargs, repeats=3, seed=42):
+    """Samples/s of ``DataGenerator(seed).<method>(**kwargs)`` and its peak allocation."""
+    def call():
+        return getattr(DataGenerator(seed=seed), method)(**kwargs)
+
+    n_samples = _n_samples(call())
+    seconds = time_call(call, repeats=repeats, warmup=0)
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'samples': n_samples,
+        'seconds': seconds,
+        'samples_per_s': n_samples / seconds,
+        'peak_alloc_mb': peak / 2 ** 20,
+    }
+
+
+def _n_samples(result):
+    # Array modalities return (data, ...labels) or just the data
+    return len(result[0] if isinstance(result, tuple) else result)
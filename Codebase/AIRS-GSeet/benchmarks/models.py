@@ -0,0 +1,82 @@
+"""
+Forward and training-step throughput of the canopy and seed models.
+
+``forward`` times inference-mode prediction; ``train`` times one optimizer
+step (forward, backward, Adam update) on a squared-output loss. Every case
+fixes its batch size, intra-op thread count and precision.
+"""
+
+import torch
+
+from benchmarks.common import time_call
+from src.models.canopy_stress_model import build_canopy_model
+from src.models.export import example_inputs
+from src.models.seed_health_model import SeedHealthModel, AflatoxinRiskModel
+
+
+# Spectra binned at 10 nm, as generate_results feeds the seed models
+SEED_HYPERSPECTRAL_DIM = 215
+
+# model -> (builder, batch sizes, batch sizes with --quick)
+MODEL_CASES = {
+    'canopy_lite': (lambda: build_canopy_model('lite', pretrained=False), (1, 8, 32), (1, 8)),
+    'canopy_full': (lambda: build_canopy_model('full', pretrained=False), (1, 8), (1,)),
+    'shi': (lambda: SeedHealthModel(hyperspectral_dim=SEED_HYPERSPECTRAL_DIM), (32, 256), (32,)),
+    'shi_attention': (lambda: SeedHealthModel(hyperspectral_dim=SEED_HYPERSPECTRAL_DIM, fusion='attention'),
+                      (32, 256), (32,)),
+    'ars': (lambda: AflatoxinRiskModel(hyperspectral_dim=SEED_HYPERSPECTRAL_DIM), (32, 256), (32,)),
+}
+
+MODES = ('forward', 'train')
+
+
+def model_cases(threads=(1,), precisions=('fp32',), models=None, batch_sizes=None, quick=False):
+    """``(name, fn, kwargs)`` for every model x batch size x thread count x precision x mode."""
+    cases = []
+    for model in models or MODEL_CASES:
+        _, sizes, quick_sizes = MODEL_CASES[model]
+        for batch_size in batch_sizes or (quick_sizes if quick else sizes):
+            for num_threads in threads:
+                for precision in precisions:
+                    for mode in MODES:
+                        name = f'model/{model}/{mode}/bs{batch_size}/t{num_threads}/{precision}'
+                        cases.append((name, bench_model, dict(model=model, mode=mode, batch_size=batch_size,
+                                                              num_threads=num_threads, precision=precision,
+                                                              repeats=3 if quick else 10)))
+    return cases
+
+
+def bench_model(model, mode, batch_size, num_threads=1, precision='fp32', repeats=10):
+    """Samples/s of one forward pass or training step of a MODEL_CASES model."""
+    torch.set_num_threads(num_threads)
+    torch.manual_seed(0)
+    net = MODEL_CASES[model][0]()
+    inputs = example_inputs(net, batch_size=batch_size, hyperspectral_dim=SEED_HYPERSPECTRAL_DIM)
+    autocast = lambda: torch.autocast('cpu', dtype=torch.bfloat16, enabled=precision == 'bf16')
+
+    if mode == 'forward':
+        net.eval()
+
+        def step():
+            with torch.inference_mode(), autocast():
+                net(*inputs)
+    elif mode == 'train':
+        net.train()
+        optimizer = torch.optim.Adam(net.parameters(), lr=1e-3)
+
+        def step():
+            with autocast():
+                loss = net(*inputs).float().pow(2).mean()
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+    else:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+    seconds = time_call(step, repeats=repeats, warmup=2)
+    return {
+        'params_m': sum(p.numel() for p in net.parameters()) / 1e6,
+        'seconds': seconds,
+        'samples_per_s': batch_size / seconds,
+        'ms_per_sample': 1000 * seconds / batch_size,
+    }
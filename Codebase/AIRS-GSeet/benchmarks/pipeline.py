@@ -0,0 +1,36 @@
+"""
+Wall-clock time of the full ``src/experiments/generate_results.py`` pipeline.
+
+The pipeline runs in a scratch working directory, so it starts with an empty
+generator cache and leaves the repository's results/ untouched. Its console
+output goes to ``pipeline.log`` in that directory.
+"""
+
+import contextlib
+import os
+import tempfile
+import time
+
+
+def pipeline_cases(workdir=None):
+    """``(name, fn, kwargs)`` for the end-to-end pipeline."""
+    return [('pipeline/generate_results', bench_pipeline, dict(workdir=workdir))]
+
+
+def bench_pipeline(workdir=None):
+    """Seconds taken by ``generate_results.main()`` run inside ``workdir`` (a temporary directory by default)."""
+    from src.experiments import generate_results
+
+    with contextlib.ExitStack() as stack:
+        if workdir is None:
+            workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(workdir, exist_ok=True)
+        previous = os.getcwd()
+        os.chdir(workdir)
+        stack.callback(os.chdir, previous)
+
+        with open('pipeline.log', 'w') as log, contextlib.redirect_stdout(log):
+            start = time.perf_counter()
+            generate_results.main()
+            seconds = time.perf_counter() - start
+    return {'seconds': seconds}
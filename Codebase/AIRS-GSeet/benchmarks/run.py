@@ -0,0 +1,104 @@
+"""
+Run the AIRS-GSeed benchmarks, write the results as JSON and compare them
+with a stored baseline.
+
+    python benchmarks/run.py --quick                        # generators + models, small sizes
+    python benchmarks/run.py --threads 1 4 --precision fp32 bf16
+    python benchmarks/run.py --suite pipeline               # full generate_results run
+    python benchmarks/run.py --save-baseline                # store this run as the baseline
+
+The process exits with status 1 when any compared metric is worse than the
+baseline by more than ``--tolerance``.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import compare_results, load_results, run_case, save_results
+
+# The suites are imported in collect_cases, not here: spawned case processes
+# re-import this module, and must not load torch (or pandas) unless their case does.
+
+SUITES = ('generators', 'models', 'pipeline')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def collect_cases(args):
+    cases = []
+    if 'generators' in args.suite:
+        from benchmarks.generators import generator_cases
+        cases += generator_cases(quick=args.quick)
+    if 'models' in args.suite:
+        from benchmarks.models import MODEL_CASES, model_cases
+        unknown = set(args.models or ()) - set(MODEL_CASES)
+        if unknown:
+            raise SystemExit(f"unknown models {sorted(unknown)}, expected some of {sorted(MODEL_CASES)}")
+        cases += model_cases(threads=args.threads, precisions=args.precision, models=args.models,
+                             batch_sizes=args.batch_sizes, quick=args.quick)
+    if 'pipeline' in args.suite:
+        from benchmarks.pipeline import pipeline_cases
+        cases += pipeline_cases()
+    if args.filter:
+        cases = [case for case in cases if args.filter in case[0]]
+    return cases
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Benchmark the AIRS-GSeed generators, models and pipeline.')
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=['generators', 'models'])
+    parser.add_argument('--quick', action='store_true', help='smaller sizes and fewer repeats')
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, os.cpu_count() or 1],
+                        help='intra-op thread counts for the model cases')
+    parser.add_argument('--precision', nargs='+', choices=('fp32', 'bf16'), default=['fp32'])
+    parser.add_argument('--models', nargs='+', help='MODEL_CASES to run (default: all)')
+    parser.add_argument('--batch-sizes', nargs='+', type=int)
+    parser.add_argument('--filter', help='only run cases whose name contains this string')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run every case in this process (faster, but RSS deltas are unreliable)')
+    parser.add_argument('--out', default='results/benchmarks.json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='also write the results to --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='relative change beyond which a metric counts as a regression')
+    args = parser.parse_args()
+    args.threads = sorted(set(args.threads))
+
+    results = {}
+    cases = collect_cases(args)
+    for i, (name, fn, kwargs) in enumerate(cases, 1):
+        print(f"[{i}/{len(cases)}] {name}", flush=True)
+        results[name] = run_case(fn, kwargs, isolate=not args.no_isolate)
+
+    table = pd.DataFrame.from_dict(results, orient='index')
+    print()
+    print(table.to_string(float_format='%.3f'))
+    save_results(args.out, results)
+    print(f"\nResults written to {args.out}")
+
+    regressions = []
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        comparison = pd.DataFrame(compare_results(results, load_results(args.baseline), args.tolerance))
+        if len(comparison):
+            print(f"\nComparison with {args.baseline} (change > 0 is an improvement):")
+            print(comparison.to_string(index=False, float_format='%.3f',
+                                       formatters={'change': '{:+.1%}'.format}))
+            regressions = comparison[comparison['regression']]
+            for row in regressions.itertuples():
+                print(f"REGRESSION {row.case} {row.metric}: {row.baseline:.3f} -> {row.current:.3f} "
+                      f"({row.change:+.1%})")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one.")
+
+    return 1 if len(regressions) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -280,12 +280,24 @@ def generate_ars_temporal():
 
 
 def generate_ablation_study():
-    """Generate ablation study results."""
+    """Generate ablation study results.
+
+    Uses the per-modality drops measured by src/experiments/generate_results.py
+    (results/ablation_study.csv) when they exist.
+    """
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    components = ['Pod-Zone\nInference', 'Hyperspectral\nData', 'Temporal\nModeling', 'Multi-Modal\nFusion']
-    shi_drops = [0.09, 0.15, 0.06, 0.11]
-    ars_drops = [0.07, 0.12, 0.08, 0.09]
+    if os.path.exists('results/ablation_study.csv'):
+        from src.experiments.ablation import MODALITY_LABELS, ablation_table
+
+        drops = ablation_table(pd.read_csv('results/ablation_study.csv'))
+        components = [MODALITY_LABELS[m] for m in drops.index]
+        shi_drops = drops['SHI'].tolist()
+        ars_drops = drops['ARS'].tolist()
+    else:
+        components = ['Pod-Zone\nInference', 'Hyperspectral\nData', 'Temporal\nModeling', 'Multi-Modal\nFusion']
+        shi_drops = [0.09, 0.15, 0.06, 0.11]
+        ars_drops = [0.07, 0.12, 0.08, 0.09]
     
     x = np.arange(len(components))
     width = 0.35
@@ -304,6 +316,8 @@ def generate_ablation_study():
     for bars in [bars1, bars2]:
         for bar in bars:
             height = bar.get_height()
+            if np.isnan(height):  # modality not used by this model
+                continue
             ax.text(bar.get_x() + bar.get_width()/2., height,
                    f'{height:.3f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
     
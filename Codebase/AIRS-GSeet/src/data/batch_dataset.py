@@ -0,0 +1,79 @@
+"""
+Batch-indexed tensor datasets.
+
+Instead of building one sample at a time and re-stacking them with the default
+collate, the dataset is indexed with a whole batch: a slice for sequential
+batches (returning views of the stored tensors) or one index tensor for
+shuffled batches (one gather per field).
+"""
+
+import torch
+from torch.utils.data import DataLoader, Dataset, Sampler
+
+
+class BatchTensorDataset(Dataset):
+    """Equal-length tensors, given as a dict or a tuple, indexed by whole batches.
+
+    With ``indices`` the dataset is the subset of those rows, gathered batch by
+    batch, so a split of memmap-backed tensors is never copied as a whole.
+    """
+
+    def __init__(self, tensors, indices=None):
+        self.tensors = tensors
+        fields = list(tensors.values()) if isinstance(tensors, dict) else list(tensors)
+        lengths = {len(t) for t in fields}
+        if len(lengths) != 1:
+            raise ValueError(f"all tensors must have the same length, got {sorted(lengths)}")
+        self.indices = torch.as_tensor(indices, dtype=torch.long) if indices is not None else None
+        self.length = len(self.indices) if self.indices is not None else lengths.pop()
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if self.indices is not None:
+            index = self.indices[index]
+        if isinstance(self.tensors, dict):
+            return {k: v[index] for k, v in self.tensors.items()}
+        return tuple(t[index] for t in self.tensors)
+
+
+class BatchIndexSampler(Sampler):
+    """Yield one slice (sequential) or index tensor (shuffled) per batch."""
+
+    def __init__(self, n, batch_size, shuffle=False, drop_last=False, generator=None):
+        self.n = n
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+
+    def __len__(self):
+        if self.drop_last:
+            return self.n // self.batch_size
+        return -(-self.n // self.batch_size)
+
+    def __iter__(self):
+        order = torch.randperm(self.n, generator=self.generator) if self.shuffle else None
+        for b in range(len(self)):
+            start, stop = b * self.batch_size, min((b + 1) * self.batch_size, self.n)
+            yield order[start:stop] if self.shuffle else slice(start, stop)
+
+
+def batch_loader(tensors, batch_size=32, shuffle=False, drop_last=False, generator=None, num_workers=0,
+                 pin_memory=None, indices=None, **loader_kwargs):
+    """DataLoader over ``tensors`` that fetches whole batches without per-item collation.
+
+    ``indices`` restricts the loader to those rows (see BatchTensorDataset).
+    With ``num_workers`` > 0 batches are prefetched by persistent worker
+    processes; ``pin_memory`` defaults to whether CUDA is available.
+    """
+    dataset = BatchTensorDataset(tensors, indices)
+    sampler = BatchIndexSampler(len(dataset), batch_size, shuffle, drop_last, generator)
+    if pin_memory is None:
+        pin_memory = torch.cuda.is_available()
+    if num_workers:
+        loader_kwargs.setdefault('persistent_workers', True)
+        loader_kwargs.setdefault('prefetch_factor', 4)
+    return DataLoader(dataset, sampler=sampler, batch_size=None, num_workers=num_workers, pin_memory=pin_memory,
+                      **loader_kwargs)
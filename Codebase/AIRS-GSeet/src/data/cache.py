@@ -0,0 +1,94 @@
+"""
+Content-addressed cache for DataGenerator outputs.
+
+Entries are keyed by a hash of the generator method, its full arguments, the
+seed entropy and the source of the data generator module, so editing the
+generator invalidates stale data. Storage reuses the SyntheticCorpus layout
+and hits are returned as memmaps (read-only unless ``mmap_mode`` says
+otherwise). The least recently used entries are evicted once the cache grows
+past its size budget.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import time
+
+from src.data import data_generator
+from src.data.corpus import SyntheticCorpus
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Short hash of the data generator source."""
+    with open(inspect.getsourcefile(data_generator), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+class GeneratorCache(SyntheticCorpus):
+    """SyntheticCorpus with code-versioned keys and LRU eviction by total size."""
+
+    def __init__(self, root='.cache/airs_gseed', max_bytes=20 * 2**30, mmap_mode='r'):
+        super().__init__(root, mmap_mode)
+        self.max_bytes = max_bytes
+
+    def entry_params(self, generator, method, **kwargs):
+        return {**super().entry_params(generator, method, **kwargs), 'code_version': code_version()}
+
+    def load(self, generator, method, **kwargs):
+        """Return the cached result of ``generator.<method>(**kwargs)``, generating it on a miss."""
+        key = self.entry_key(self.entry_params(generator, method, **kwargs))
+        if key not in self.manifest:
+            self.write(generator, method, **kwargs)
+            entry_dir = os.path.join(self.root, key)
+            self.manifest[key]['bytes'] = sum(
+                os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+            self.evict(keep=key)
+        self.manifest[key]['last_used'] = time.time()
+        self._write_manifest()
+        return self.open(key)
+
+    def total_bytes(self):
+        """Disk space used by all cached entries."""
+        return sum(entry.get('bytes', 0) for entry in self.manifest.values())
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        by_age = sorted(self.manifest, key=lambda k: self.manifest[k].get('last_used', 0))
+        for key in by_age:
+            if self.total_bytes() <= self.max_bytes:
+                break
+            if key != keep:
+                self.remove(key)
+
+    def clear(self):
+        """Remove every cached entry."""
+        for key in list(self.manifest):
+            self.remove(key)
+
+
+class CachedGenerator:
+    """DataGenerator proxy whose ``generate_*`` methods are served from a GeneratorCache.
+
+    Calls that pass ``out=`` bypass the cache; everything else (``rng``,
+    ``spawn``, ``iter_*``) is forwarded to the wrapped generator.
+    """
+
+    def __init__(self, generator, cache=None):
+        self.generator = generator
+        self.cache = cache if cache is not None else GeneratorCache()
+
+    def __getattr__(self, name):
+        attr = getattr(self.generator, name)
+        if not name.startswith('generate_') or name == 'generate_parallel':
+            return attr
+
+        @functools.wraps(attr)
+        def cached(*args, **kwargs):
+            if 'out' in kwargs:
+                return attr(*args, **kwargs)
+            kwargs = inspect.signature(attr).bind(*args, **kwargs).arguments
+            return self.cache.load(self.generator, name, **kwargs)
+
+        return cached
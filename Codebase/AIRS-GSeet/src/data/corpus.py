@@ -0,0 +1,152 @@
+"""
+On-disk corpus of synthetic AIRS-GSeed data.
+
+Image and spectra arrays are written chunk by chunk into .npy files and opened
+again as read-only memmaps; sensor and weather tables are stored as Parquet.
+A manifest maps each entry, keyed by generator method, arguments and seed, to
+its files so experiments can reopen identical data instead of regenerating it.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data.data_generator import SAMPLE_SHAPES
+
+
+class SyntheticCorpus:
+    """Persisted ``DataGenerator.generate_*`` outputs under a root directory.
+
+    Arrays are opened with ``mmap_mode``: ``'r'`` (read-only) by default, or
+    ``'c'`` (copy-on-write) so ``torch.from_numpy`` can wrap them without a copy.
+    """
+
+    def __init__(self, root='corpus', mmap_mode='r'):
+        self.root = root
+        self.mmap_mode = mmap_mode
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    def entry_params(self, generator, method, **kwargs):
+        """Full parameters of ``generator.<method>(**kwargs)``, defaults included."""
+        bound = inspect.signature(getattr(generator, method)).bind(**kwargs)
+        bound.apply_defaults()
+        arguments = {k: _jsonable(v) for k, v in bound.arguments.items() if k not in ('out', 'chunk_size')}
+        # chunk_size selects the random streams, so it is part of the data identity
+        arguments['chunk_size'] = bound.arguments['chunk_size']
+        # The entropy, not the seed argument: DataGenerator(seed=None) draws fresh entropy per instance
+        return {'method': method, 'seed': _jsonable(generator.seed_sequence.entropy), 'kwargs': arguments}
+
+    @staticmethod
+    def entry_key(params):
+        """Stable key for a parameter dict from ``entry_params``."""
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:20]
+
+    def __contains__(self, key):
+        return key in self.manifest
+
+    def load(self, generator, method, **kwargs):
+        """Open ``generator.<method>(**kwargs)`` from the corpus, writing it first if missing."""
+        params = self.entry_params(generator, method, **kwargs)
+        key = self.entry_key(params)
+        if key not in self.manifest:
+            self.write(generator, method, **kwargs)
+        return self.open(key)
+
+    def write(self, generator, method, **kwargs):
+        """Generate ``generator.<method>(**kwargs)`` into the corpus and return its key."""
+        params = self.entry_params(generator, method, **kwargs)
+        key = self.entry_key(params)
+        final_dir = os.path.join(self.root, key)
+        tmp_dir = final_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        # Array modalities are generated straight into a .npy memmap
+        modality = method[len('generate_'):]
+        if modality in SAMPLE_SHAPES:
+            call = params['kwargs']
+            n = next(iter(call.values()))
+            size_kwargs = {k: call[k] for k in inspect.signature(SAMPLE_SHAPES[modality]).parameters}
+            shape = (n, *SAMPLE_SHAPES[modality](**size_kwargs))
+            out = np.lib.format.open_memmap(os.path.join(tmp_dir, 'data.npy'), mode='w+',
+                                            dtype=call.get('dtype', 'float64'), shape=shape)
+            result = getattr(generator, method)(out=out, **kwargs)
+        else:
+            result = getattr(generator, method)(**kwargs)
+
+        layout = _save(result, tmp_dir, 'data')
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+
+        self.manifest[key] = {**params, 'layout': layout}
+        self._write_manifest()
+        return key
+
+    def open(self, key):
+        """Open a stored entry: arrays as memmaps, tables as DataFrames."""
+        return _load(self.manifest[key]['layout'], os.path.join(self.root, key), self.mmap_mode)
+
+    def remove(self, key):
+        """Delete a stored entry."""
+        shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+        self.manifest.pop(key, None)
+        self._write_manifest()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _jsonable(value):
+    """Normalise an argument value for the manifest (tuples, numpy scalars, dtypes)."""
+    if isinstance(value, (tuple, list)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (type, np.dtype)):
+        return np.dtype(value).name
+    return value
+
+
+def _save(obj, directory, name):
+    """Write a generator result to ``directory`` and return its layout description."""
+    if isinstance(obj, pd.DataFrame):
+        obj.to_parquet(os.path.join(directory, f'{name}.parquet'), index=False)
+        return {'table': f'{name}.parquet'}
+    if isinstance(obj, np.memmap):
+        obj.flush()
+        return {'array': os.path.basename(obj.filename)}
+    if isinstance(obj, np.ndarray):
+        np.save(os.path.join(directory, f'{name}.npy'), obj)
+        return {'array': f'{name}.npy'}
+    if isinstance(obj, dict):
+        return {'dict': {k: _save(v, directory, f'{name}_{k}') for k, v in obj.items()}}
+    if isinstance(obj, tuple):
+        return {'tuple': [_save(v, directory, f'{name}_{i}') for i, v in enumerate(obj)]}
+    raise TypeError(f"cannot store {type(obj).__name__} in the corpus")
+
+
+def _load(layout, directory, mmap_mode='r'):
+    """Rebuild a generator result from its layout description."""
+    if 'table' in layout:
+        return pd.read_parquet(os.path.join(directory, layout['table']))
+    if 'array' in layout:
+        return np.load(os.path.join(directory, layout['array']), mmap_mode=mmap_mode)
+    if 'dict' in layout:
+        return {k: _load(v, directory, mmap_mode) for k, v in layout['dict'].items()}
+    return tuple(_load(v, directory, mmap_mode) for v in layout['tuple'])
@@ -10,254 +10,359 @@ from scipy.interpolate import interp1d
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+
+# Modalities with their own random streams; the index is part of each stream's key
+MODALITIES = ('uav_rgb', 'multispectral', 'thermal', 'soil_sensor', 'hyperspectral_seed', 'storage_iot', 'weather')
+
+# Per-sample array shape of the modalities generate_parallel can shard, from their size keyword
+SAMPLE_SHAPES = {
+    'uav_rgb': lambda img_size=(256, 256): (*img_size, 3),
+    'multispectral': lambda img_size=(128, 128): (*img_size, 5),
+    'thermal': lambda img_size=(64, 64): tuple(img_size),
+    'hyperspectral_seed': lambda n_wavelengths=2151: (n_wavelengths,),
+}
 
 
 class DataGenerator:
-    """Generate synthetic multi-modal agricultural data."""
+    """Generate synthetic multi-modal agricultural data.
+
+    Nothing here touches the global ``np.random`` state. Every chunk of every
+    modality draws from its own child stream of ``SeedSequence(seed)``, keyed by
+    (modality, chunk index), so a given chunk_size yields the same data whether
+    chunks are generated serially, in threads or across processes. ``rng`` is a
+    separate stream for callers that need extra seeded noise.
+    """
     
     def __init__(self, seed=42):
-        np.random.seed(seed)
         self.seed = seed
-        
-    def generate_uav_rgb(self, n_images=100, img_size=(256, 256)):
-        """Generate synthetic UAV RGB images with disease patterns."""
-        images = []
-        labels = []
-        
-        for i in range(n_images):
-            # Base healthy vegetation (green)
-            img = np.zeros((*img_size, 3))
-            img[:, :, 1] = np.random.uniform(0.4, 0.7, img_size)  # Green channel
-            
-            # Add disease patterns for some images
-            if np.random.random() < 0.4:  # 40% have disease
-                # Leaf spot (brown patches)
-                n_spots = np.random.randint(5, 15)
-                for _ in range(n_spots):
-                    x, y = np.random.randint(0, img_size[0], 2)
-                    r = np.random.randint(10, 30)
-                    y_coords, x_coords = np.ogrid[:img_size[0], :img_size[1]]
-                    mask = (x_coords - x)**2 + (y_coords - y)**2 <= r**2
-                    img[mask, 0] = np.random.uniform(0.3, 0.5)  # Brown
-                    img[mask, 1] = np.random.uniform(0.2, 0.4)
-                    img[mask, 2] = np.random.uniform(0.1, 0.3)
-                
-                labels.append(1)  # Diseased
-            else:
-                labels.append(0)  # Healthy
-            
-            images.append(img)
-        
-        return np.array(images), np.array(labels)
-    
-    def generate_multispectral(self, n_images=100, img_size=(128, 128)):
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+    def spawn(self, modality, chunk=0):
+        """Return the independent Generator for one chunk of ``modality``."""
+        key = (MODALITIES.index(modality), chunk)
+        return np.random.default_rng(np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=key))
+
+    def generate_uav_rgb(self, n_images=100, img_size=(256, 256), chunk_size=64, dtype=np.float64, out=None):
+        """Generate synthetic UAV RGB images with disease patterns.
+
+        Frames are painted ``chunk_size`` at a time straight into ``out``, which
+        may be a caller-supplied array or ``np.memmap`` of shape (n, H, W, 3).
+        """
+        images = _output_array(out, (n_images, *img_size, 3), dtype)
+        labels = np.empty(n_images, dtype=np.int64)
+        for start in range(0, n_images, chunk_size):
+            stop = min(start + chunk_size, n_images)
+            labels[start:stop] = self._fill_uav_rgb(images[start:stop], self.spawn('uav_rgb', start // chunk_size))
+        return images, labels
+
+    def iter_uav_rgb(self, n_images=100, img_size=(256, 256), chunk_size=64, dtype=np.float64):
+        """Yield (images, labels) chunks of at most ``chunk_size`` UAV RGB frames.
+
+        The image array is a reusable buffer overwritten by the next chunk.
+        """
+        buffer = np.empty((chunk_size, *img_size, 3), dtype=dtype)
+        for start in range(0, n_images, chunk_size):
+            chunk = buffer[:min(chunk_size, n_images - start)]
+            labels = self._fill_uav_rgb(chunk, self.spawn('uav_rgb', start // chunk_size))
+            yield chunk, labels
+
+    def _fill_uav_rgb(self, out, rng):
+        """Paint UAV RGB frames into ``out`` [N, H, W, 3] and return their labels.
+
+        Labels, spot counts, centres, radii and colours are drawn as arrays and
+        spots are painted inside their bounding boxes only.
+        """
+        n_images, height, width, _ = out.shape
+        out[...] = 0
+
+        # 40% of images have disease
+        labels = (rng.random(n_images) < 0.4).astype(np.int64)
+
+        # Base healthy vegetation (green)
+        out[..., 1] = rng.uniform(0.4, 0.7, (n_images, height, width))
+
+        # Leaf spots (brown patches): 5-14 per diseased image
+        diseased = np.flatnonzero(labels)
+        n_spots = rng.integers(5, 15, len(diseased))
+        spot_image = np.repeat(diseased, n_spots)
+        n_total = len(spot_image)
+        spot_y = rng.integers(0, height, n_total)
+        spot_x = rng.integers(0, width, n_total)
+        spot_r = rng.integers(10, 30, n_total)
+        spot_rgb = rng.uniform([0.3, 0.2, 0.1], [0.5, 0.4, 0.3], (n_total, 3))  # Brown
+
+        for i, y, x, r, rgb in zip(spot_image, spot_y, spot_x, spot_r, spot_rgb):
+            y0, y1 = max(y - r, 0), min(y + r + 1, height)
+            x0, x1 = max(x - r, 0), min(x + r + 1, width)
+            yy, xx = np.ogrid[y0 - y:y1 - y, x0 - x:x1 - x]
+            mask = xx**2 + yy**2 <= r**2
+            out[i, y0:y1, x0:x1][mask] = rgb
+
+        return labels
+
+    def generate_multispectral(self, n_images=100, img_size=(128, 128), chunk_size=64, dtype=np.float64, out=None):
         """Generate synthetic multispectral images (RGB, Red-edge, NIR)."""
-        images = []
-        
-        for i in range(n_images):
+        images = _output_array(out, (n_images, *img_size, 5), dtype)
+        for start in range(0, n_images, chunk_size):
+            self._fill_multispectral(images[start:start + chunk_size], self.spawn('multispectral', start // chunk_size))
+        return images
+
+    def iter_multispectral(self, n_images=100, img_size=(128, 128), chunk_size=64, dtype=np.float64):
+        """Yield chunks of multispectral images in a reusable buffer."""
+        buffer = np.empty((chunk_size, *img_size, 5), dtype=dtype)
+        for start in range(0, n_images, chunk_size):
+            chunk = buffer[:min(chunk_size, n_images - start)]
+            self._fill_multispectral(chunk, self.spawn('multispectral', start // chunk_size))
+            yield chunk
+
+    def _fill_multispectral(self, out, rng):
+        """Fill ``out`` [N, H, W, 5] with multispectral images."""
+        img_size = out.shape[1:3]
+
+        for img in out:
             # 5 bands: R, G, B, Red-edge, NIR
-            img = np.zeros((*img_size, 5))
-            
             # Healthy vegetation: high NIR, moderate red-edge
-            img[:, :, 4] = np.random.uniform(0.6, 0.9, img_size)  # NIR
-            img[:, :, 3] = np.random.uniform(0.4, 0.7, img_size)  # Red-edge
-            img[:, :, 0] = np.random.uniform(0.2, 0.4, img_size)  # Red
-            img[:, :, 1] = np.random.uniform(0.3, 0.6, img_size)  # Green
-            img[:, :, 2] = np.random.uniform(0.1, 0.3, img_size)  # Blue
-            
+            img[:, :, 4] = rng.uniform(0.6, 0.9, img_size)  # NIR
+            img[:, :, 3] = rng.uniform(0.4, 0.7, img_size)  # Red-edge
+            img[:, :, 0] = rng.uniform(0.2, 0.4, img_size)  # Red
+            img[:, :, 1] = rng.uniform(0.3, 0.6, img_size)  # Green
+            img[:, :, 2] = rng.uniform(0.1, 0.3, img_size)  # Blue
+
             # Stress reduces NIR and red-edge
-            if np.random.random() < 0.4:
-                stress_mask = np.random.random(img_size) < 0.3
+            if rng.random() < 0.4:
+                stress_mask = rng.random(img_size) < 0.3
                 img[stress_mask, 4] *= 0.6  # Reduced NIR
                 img[stress_mask, 3] *= 0.7  # Reduced red-edge
                 img[stress_mask, 0] *= 1.2  # Increased red
-            
-            images.append(img)
-        
-        return np.array(images)
-    
-    def generate_thermal(self, n_images=100, img_size=(64, 64)):
+
+    def generate_thermal(self, n_images=100, img_size=(64, 64), chunk_size=64, dtype=np.float64, out=None):
         """Generate synthetic thermal images."""
-        images = []
-        
-        for i in range(n_images):
+        images = _output_array(out, (n_images, *img_size), dtype)
+        for start in range(0, n_images, chunk_size):
+            self._fill_thermal(images[start:start + chunk_size], self.spawn('thermal', start // chunk_size))
+        return images
+
+    def iter_thermal(self, n_images=100, img_size=(64, 64), chunk_size=64, dtype=np.float64):
+        """Yield chunks of thermal images in a reusable buffer."""
+        buffer = np.empty((chunk_size, *img_size), dtype=dtype)
+        for start in range(0, n_images, chunk_size):
+            chunk = buffer[:min(chunk_size, n_images - start)]
+            self._fill_thermal(chunk, self.spawn('thermal', start // chunk_size))
+            yield chunk
+
+    def _fill_thermal(self, out, rng):
+        """Fill ``out`` [N, H, W] with thermal images."""
+        img_size = out.shape[1:]
+
+        for temp in out:
             # Base temperature: 25-30°C for healthy canopy
-            temp = np.random.normal(27.5, 2.0, img_size)
-            
+            temp[...] = rng.normal(27.5, 2.0, img_size)
+
             # Stress increases temperature (water stress)
-            if np.random.random() < 0.3:
-                stress_mask = np.random.random(img_size) < 0.25
-                temp[stress_mask] += np.random.uniform(2, 5)
-            
-            images.append(temp)
-        
-        return np.array(images)
-    
-    def generate_soil_sensor_data(self, n_days=100, n_sensors=5):
+            if rng.random() < 0.3:
+                stress_mask = rng.random(img_size) < 0.25
+                temp[stress_mask] += rng.uniform(2, 5)
+
+    def generate_soil_sensor_data(self, n_days=100, n_sensors=5, chunk_size=64):
         """Generate synthetic soil sensor time series."""
-        data = []
-        
-        base_date = datetime(2023, 6, 1)
-        
-        for sensor_id in range(n_sensors):
-            dates = [base_date + timedelta(days=d, hours=h*15//60) 
-                    for d in range(n_days) for h in range(0, 96, 1)]  # 15-min intervals
-            
-            # Soil moisture: seasonal pattern with noise
-            days = np.arange(len(dates))
-            moisture = 50 + 20 * np.sin(2 * np.pi * days / 30)  # Monthly cycle
-            moisture += np.random.normal(0, 5, len(dates))
-            moisture = np.clip(moisture, 20, 80)
-            
-            # Soil temperature: diurnal + seasonal
-            temp = 25 + 5 * np.sin(2 * np.pi * days / 365)  # Seasonal
-            temp += 3 * np.sin(2 * np.pi * np.arange(len(dates)) / 96)  # Diurnal
-            temp += np.random.normal(0, 1, len(dates))
-            
-            # EC (electrical conductivity)
-            ec = 1.5 + 0.5 * np.sin(2 * np.pi * days / 30)
-            ec += np.random.normal(0, 0.2, len(dates))
-            ec = np.clip(ec, 0.5, 3.0)
-            
-            df = pd.DataFrame({
-                'timestamp': dates,
-                'sensor_id': sensor_id,
-                'soil_moisture_vwc': moisture,
-                'soil_temperature': temp,
-                'ec': ec
-            })
-            
-            data.append(df)
-        
-        return pd.concat(data, ignore_index=True)
-    
-    def generate_hyperspectral_seed(self, n_samples=500, n_wavelengths=2151):
+        return pd.concat(self.iter_soil_sensor_data(n_days, n_sensors, chunk_size), ignore_index=True)
+
+    def iter_soil_sensor_data(self, n_days=100, n_sensors=5, chunk_size=64):
+        """Yield soil sensor DataFrames covering ``chunk_size`` sensors each."""
+        for start in range(0, n_sensors, chunk_size):
+            sensor_ids = np.arange(start, min(start + chunk_size, n_sensors))
+            yield self._soil_sensor_frame(self.spawn('soil_sensor', start // chunk_size), sensor_ids, n_sensors, n_days)
+
+    def _soil_sensor_frame(self, rng, sensor_ids, n_sensors, n_days):
+        """Time series of a block of soil sensors, generated as [sensor, time] arrays."""
+        n_steps = n_days * 96
+        shape = (len(sensor_ids), n_steps)
+        timestamps = pd.date_range(datetime(2023, 6, 1), periods=n_steps, freq='15min')  # 15-min intervals
+
+        # Soil moisture: seasonal pattern with noise
+        days = np.arange(n_steps)
+        moisture = 50 + 20 * np.sin(2 * np.pi * days / 30)  # Monthly cycle
+        moisture = moisture + rng.normal(0, 5, shape)
+        moisture = np.clip(moisture, 20, 80)
+
+        # Soil temperature: diurnal + seasonal
+        temp = 25 + 5 * np.sin(2 * np.pi * days / 365)  # Seasonal
+        temp += 3 * np.sin(2 * np.pi * np.arange(n_steps) / 96)  # Diurnal
+        temp = temp + rng.normal(0, 1, shape)
+
+        # EC (electrical conductivity)
+        ec = 1.5 + 0.5 * np.sin(2 * np.pi * days / 30)
+        ec = ec + rng.normal(0, 0.2, shape)
+        ec = np.clip(ec, 0.5, 3.0)
+
+        return pd.DataFrame({
+            'timestamp': np.tile(timestamps.values, len(sensor_ids)),
+            'sensor_id': pd.Categorical(np.repeat(sensor_ids, n_steps), categories=np.arange(n_sensors)),
+            'soil_moisture_vwc': moisture.ravel(),
+            'soil_temperature': temp.ravel(),
+            'ec': ec.ravel()
+        })
+
+    def generate_hyperspectral_seed(self, n_samples=500, n_wavelengths=2151, chunk_size=64, dtype=np.float64, out=None):
         """Generate synthetic hyperspectral seed spectra."""
-        # Wavelength range: 400-2500 nm
-        wavelengths = np.linspace(400, 2500, n_wavelengths)
-        
-        spectra = []
+        wavelengths = _seed_spectral_profile(n_wavelengths)[0]
+
+        spectra = _output_array(out, (n_samples, n_wavelengths), dtype)
         labels = {
-            'germination_rate': [],
-            'fungal_presence': [],
-            'aflatoxin_ppb': []
+            'germination_rate': np.empty(n_samples),
+            'fungal_presence': np.empty(n_samples, dtype=np.int64),
+            'aflatoxin_ppb': np.empty(n_samples)
         }
-        
-        for i in range(n_samples):
-            # Base spectrum: healthy seed
-            spectrum = np.ones(n_wavelengths) * 0.5
-            
-            # Add absorption features
-            # Water absorption at 1450, 1940 nm
-            spectrum[abs(wavelengths - 1450) < 50] *= 0.7
-            spectrum[abs(wavelengths - 1940) < 50] *= 0.6
-            
-            # Protein absorption at 2180 nm
-            spectrum[abs(wavelengths - 2180) < 30] *= 0.8
-            
-            # Add noise
-            spectrum += np.random.normal(0, 0.02, n_wavelengths)
-            
-            # Degrade spectrum for unhealthy seeds
-            is_unhealthy = np.random.random() < 0.3
-            if is_unhealthy:
-                # Reduced reflectance (darker)
-                spectrum *= np.random.uniform(0.7, 0.9)
-                # Additional absorption features (fungal)
-                spectrum[abs(wavelengths - 1650) < 40] *= 0.75
-                
-                germination = np.random.uniform(40, 70)
-                fungal = 1
-                aflatoxin = np.random.lognormal(2, 1)  # Log-normal distribution
-            else:
-                germination = np.random.uniform(75, 95)
-                fungal = 0
-                aflatoxin = np.random.lognormal(0.5, 0.5)
-            
-            spectra.append(spectrum)
-            labels['germination_rate'].append(germination)
-            labels['fungal_presence'].append(fungal)
-            labels['aflatoxin_ppb'].append(aflatoxin)
-        
-        return np.array(spectra), wavelengths, labels
-    
-    def generate_storage_iot(self, n_days=90, n_units=5):
+
+        for start in range(0, n_samples, chunk_size):
+            stop = min(start + chunk_size, n_samples)
+            chunk_labels = self._fill_hyperspectral_seed(spectra[start:stop], self.spawn('hyperspectral_seed', start // chunk_size))
+            for key, values in chunk_labels.items():
+                labels[key][start:stop] = values
+
+        return spectra, wavelengths.copy(), labels
+
+    def iter_hyperspectral_seed(self, n_samples=500, n_wavelengths=2151, chunk_size=64, dtype=np.float64):
+        """Yield (spectra, labels) chunks of hyperspectral seed spectra.
+
+        The spectra array is a reusable buffer overwritten by the next chunk.
+        """
+        buffer = np.empty((chunk_size, n_wavelengths), dtype=dtype)
+        for start in range(0, n_samples, chunk_size):
+            chunk = buffer[:min(chunk_size, n_samples - start)]
+            labels = self._fill_hyperspectral_seed(chunk, self.spawn('hyperspectral_seed', start // chunk_size))
+            yield chunk, labels
+
+    def _fill_hyperspectral_seed(self, out, rng):
+        """Fill ``out`` [N, n_wavelengths] with seed spectra and return their labels.
+
+        The whole chunk is built at once: precomputed base spectrum plus noise,
+        then per-sample darkening and fungal absorption for unhealthy seeds.
+        Everything is drawn and computed in float64 and cast to ``out.dtype``
+        once, so a seed gives the same spectra and labels for every dtype.
+        """
+        n_samples, n_wavelengths = out.shape
+        _, base, fungal_band = _seed_spectral_profile(n_wavelengths)
+
+        # Base spectrum with absorption features, plus noise
+        if out.dtype == np.float64 and out.flags.c_contiguous:
+            spectra = rng.standard_normal(out=out)
+        else:
+            spectra = rng.standard_normal((n_samples, n_wavelengths))
+        spectra *= 0.02
+        spectra += base
+
+        # Degrade spectrum for unhealthy seeds
+        is_unhealthy = rng.random(n_samples) < 0.3
+        # Reduced reflectance (darker)
+        spectra *= np.where(is_unhealthy, rng.uniform(0.7, 0.9, n_samples), 1.0)[:, None]
+        # Additional absorption features (fungal)
+        spectra[is_unhealthy, fungal_band] *= 0.75
+        if spectra is not out:
+            out[...] = spectra
+
+        return {
+            'germination_rate': rng.uniform(np.where(is_unhealthy, 40, 75), np.where(is_unhealthy, 70, 95)),
+            'fungal_presence': is_unhealthy.astype(np.int64),
+            # Log-normal distribution
+            'aflatoxin_ppb': rng.lognormal(np.where(is_unhealthy, 2, 0.5), np.where(is_unhealthy, 1, 0.5))
+        }
+
+    def generate_storage_iot(self, n_days=90, n_units=5, chunk_size=64):
         """Generate synthetic storage IoT sensor data."""
-        data = []
-        
-        base_date = datetime(2023, 11, 1)
-        
-        for unit_id in range(n_units):
-            dates = [base_date + timedelta(days=d, minutes=m*5) 
-                    for d in range(n_days) for m in range(288)]  # 5-min intervals
-            
-            # Temperature: controlled storage (20-25°C) or ambient (varies)
-            is_controlled = np.random.random() < 0.5
-            if is_controlled:
-                temp = 22 + np.random.normal(0, 1, len(dates))
-            else:
-                temp = 25 + 5 * np.sin(2 * np.pi * np.arange(len(dates)) / 288)  # Diurnal
-                temp += np.random.normal(0, 2, len(dates))
-            
-            # RH: 60-70% ideal, higher = risk
-            rh = 65 + 10 * np.sin(2 * np.pi * np.arange(len(dates)) / 288)
-            rh += np.random.normal(0, 3, len(dates))
-            rh = np.clip(rh, 40, 85)
-            
-            # CO₂: increases with spoilage
-            co2 = 400 + np.random.normal(0, 50, len(dates))
-            # Add spoilage events
-            spoilage_days = np.random.choice(range(30, n_days), size=2, replace=False)
-            for day in spoilage_days:
-                start_idx = day * 288
-                co2[start_idx:] += np.linspace(0, 500, len(dates) - start_idx)
-            
-            co2 = np.clip(co2, 400, 2000)
-            
-            # VOC: binary/qualitative (0 or 1)
-            voc = np.zeros(len(dates))
-            for day in spoilage_days:
-                start_idx = day * 288
-                voc[start_idx:] = 1
-            
-            df = pd.DataFrame({
-                'timestamp': dates,
-                'storage_unit_id': unit_id,
-                'temperature': temp,
-                'rh': rh,
-                'co2': co2,
-                'voc': voc
-            })
-            
-            data.append(df)
-        
-        return pd.concat(data, ignore_index=True)
-    
-    def generate_weather_data(self, n_days=120):
+        return pd.concat(self.iter_storage_iot(n_days, n_units, chunk_size), ignore_index=True)
+
+    def iter_storage_iot(self, n_days=90, n_units=5, chunk_size=64):
+        """Yield storage IoT DataFrames covering ``chunk_size`` units each."""
+        for start in range(0, n_units, chunk_size):
+            unit_ids = np.arange(start, min(start + chunk_size, n_units))
+            yield self._storage_unit_frame(self.spawn('storage_iot', start // chunk_size), unit_ids, n_units, n_days)
+
+    def _storage_unit_frame(self, rng, unit_ids, n_units, n_days):
+        """Time series of a block of storage units, generated as [unit, time] arrays."""
+        n_steps = n_days * 288
+        n = len(unit_ids)
+        shape = (n, n_steps)
+        timestamps = pd.date_range(datetime(2023, 11, 1), periods=n_steps, freq='5min')  # 5-min intervals
+        steps = np.arange(n_steps)
+        diurnal = np.sin(2 * np.pi * steps / 288)
+
+        # Temperature: controlled storage (20-25°C) or ambient (varies)
+        is_controlled = (rng.random(n) < 0.5)[:, None]
+        temp = np.where(is_controlled, 22.0, 25 + 5 * diurnal)  # Diurnal
+        temp = temp + rng.standard_normal(shape) * np.where(is_controlled, 1.0, 2.0)
+
+        # RH: 60-70% ideal, higher = risk
+        rh = 65 + 10 * diurnal
+        rh = rh + rng.normal(0, 3, shape)
+        rh = np.clip(rh, 40, 85)
+
+        # CO₂: increases with spoilage
+        co2 = 400 + rng.normal(0, 50, shape)
+        # Add spoilage events: two distinct days per unit from day 30 on
+        # (from mid-horizon for runs shorter than 60 days)
+        first_day = min(30, n_days // 2)
+        spoilage_days = rng.random((n, n_days - first_day)).argsort(axis=1)[:, :2] + first_day
+        for start_idx in (spoilage_days * 288).T:
+            ramp_len = np.maximum(n_steps - start_idx - 1, 1)[:, None]
+            co2 += np.where(steps >= start_idx[:, None], (steps - start_idx[:, None]) * 500 / ramp_len, 0)
+
+        co2 = np.clip(co2, 400, 2000)
+
+        # VOC: binary/qualitative (0 or 1)
+        if spoilage_days.shape[1]:
+            voc = (steps >= spoilage_days.min(axis=1)[:, None] * 288).astype(float)
+        else:
+            voc = np.zeros(shape)
+
+        return pd.DataFrame({
+            'timestamp': np.tile(timestamps.values, n),
+            'storage_unit_id': pd.Categorical(np.repeat(unit_ids, n_steps), categories=np.arange(n_units)),
+            'temperature': temp.ravel(),
+            'rh': rh.ravel(),
+            'co2': co2.ravel(),
+            'voc': voc.ravel()
+        })
+
+    def generate_weather_data(self, n_days=120, chunk_size=366):
         """Generate synthetic weather data."""
-        dates = [datetime(2023, 6, 1) + timedelta(days=d) for d in range(n_days)]
-        
+        return pd.concat(self.iter_weather_data(n_days, chunk_size), ignore_index=True)
+
+    def iter_weather_data(self, n_days=120, chunk_size=366):
+        """Yield weather DataFrames covering ``chunk_size`` days each."""
+        for start in range(0, n_days, chunk_size):
+            yield self._weather_frame(self.spawn('weather', start // chunk_size), np.arange(start, min(start + chunk_size, n_days)))
+
+    def _weather_frame(self, rng, days):
+        """Daily weather records for the given day offsets."""
+        n_days = len(days)
+        dates = [datetime(2023, 6, 1) + timedelta(days=int(d)) for d in days]
+
         # Temperature: seasonal pattern
-        days = np.arange(n_days)
-        temp_max = 32 + 5 * np.sin(2 * np.pi * days / 120) + np.random.normal(0, 2, n_days)
-        temp_min = temp_max - 8 + np.random.normal(0, 1, n_days)
-        
+        temp_max = 32 + 5 * np.sin(2 * np.pi * days / 120) + rng.normal(0, 2, n_days)
+        temp_min = temp_max - 8 + rng.normal(0, 1, n_days)
+
         # Precipitation: random events
-        precip = np.random.exponential(2, n_days)
+        precip = rng.exponential(2, n_days)
         precip[precip > 20] = 0  # Some dry days
-        
+
         # RH: inverse of temperature
-        rh_mean = 70 - (temp_max - 25) * 2 + np.random.normal(0, 5, n_days)
+        rh_mean = 70 - (temp_max - 25) * 2 + rng.normal(0, 5, n_days)
         rh_mean = np.clip(rh_mean, 40, 90)
-        
+
         # Solar radiation
-        solar = 20 + 5 * np.sin(2 * np.pi * days / 120) + np.random.normal(0, 2, n_days)
+        solar = 20 + 5 * np.sin(2 * np.pi * days / 120) + rng.normal(0, 2, n_days)
         solar = np.clip(solar, 10, 30)
-        
+
         # Wind speed
-        wind = 5 + np.random.exponential(2, n_days)
+        wind = 5 + rng.exponential(2, n_days)
         wind = np.clip(wind, 2, 15)
-        
+
         df = pd.DataFrame({
             'date': dates,
             'temp_max': temp_max,
@@ -267,9 +372,118 @@ class DataGenerator:
             'solar_radiation': solar,
             'wind_speed': wind
         })
-        
+
         return df
 
+    def generate_parallel(self, modality, n, workers=None, path=None, chunk_size=64, dtype=np.float64, **kwargs):
+        """Generate ``n`` samples of an array modality across a process pool.
+
+        Chunks are split into one contiguous shard per worker. Each worker rebuilds
+        the chunk streams from the seed and writes its rows into a shared ``.npy``
+        memmap at ``path`` (or a shared-memory block when ``path`` is None), so
+        only the labels are pickled back. The result matches the serial
+        ``generate_<modality>`` with the same chunk_size for any worker count, and
+        is returned in the same form; with ``path`` the arrays are memmaps.
+        """
+        if modality not in SAMPLE_SHAPES:
+            raise ValueError(f"generate_parallel supports {sorted(SAMPLE_SHAPES)}, not {modality!r}")
+        if n == 0:
+            # Nothing to shard (and no zero-length memmap); the serial result is already empty
+            return getattr(self, f'generate_{modality}')(0, chunk_size=chunk_size, dtype=dtype, **kwargs)
+        shape = (n, *SAMPLE_SHAPES[modality](**kwargs))
+        n_chunks = -(-n // chunk_size)
+        workers = min(workers or os.cpu_count(), n_chunks)
+        shards = [s for s in np.array_split(np.arange(n_chunks), workers) if len(s)]
+
+        shm = None
+        if path is None:
+            shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+            target = shm.name
+        else:
+            np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape).flush()
+            target = path
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_generate_shard, self.seed_sequence.entropy, modality, shard.tolist(),
+                                       chunk_size, shape, np.dtype(dtype).str, target, path is None)
+                           for shard in shards]
+                chunk_labels = [labels for future in futures for labels in future.result()]
+            if shm is None:
+                data = np.load(path, mmap_mode='r+')
+            else:
+                data = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        if modality == 'uav_rgb':
+            return data, np.concatenate(chunk_labels)
+        if modality == 'hyperspectral_seed':
+            labels = {key: np.concatenate([c[key] for c in chunk_labels]) for key in chunk_labels[0]}
+            return data, _seed_spectral_profile(shape[1])[0].copy(), labels
+        return data
+
+    def _fill_chunk(self, modality, out, chunk):
+        """Fill ``out`` with chunk number ``chunk`` of an array modality."""
+        rng = self.spawn(modality, chunk)
+        return getattr(self, f'_fill_{modality}')(out, rng)
+
+
+def _generate_shard(entropy, modality, chunks, chunk_size, shape, dtype, target, shared):
+    """Process-pool worker: write ``chunks`` of a modality into the shared output."""
+    gen = DataGenerator(entropy)
+    if shared:
+        shm = shared_memory.SharedMemory(name=target)
+        data = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    else:
+        data = np.load(target, mmap_mode='r+')
+
+    labels = []
+    for chunk in chunks:
+        start = chunk * chunk_size
+        labels.append(gen._fill_chunk(modality, data[start:start + chunk_size], chunk))
+
+    if shared:
+        del data
+        shm.close()
+    else:
+        data.flush()
+    return labels
+
+
+@functools.lru_cache(maxsize=8)
+def _seed_spectral_profile(n_wavelengths):
+    """Wavelength grid, healthy base spectrum and fungal band, computed once per grid size."""
+    # Wavelength range: 400-2500 nm
+    wavelengths = np.linspace(400, 2500, n_wavelengths)
+
+    # Base spectrum: healthy seed
+    base = np.full(n_wavelengths, 0.5)
+    # Water absorption at 1450, 1940 nm
+    base[abs(wavelengths - 1450) < 50] *= 0.7
+    base[abs(wavelengths - 1940) < 50] *= 0.6
+    # Protein absorption at 2180 nm
+    base[abs(wavelengths - 2180) < 30] *= 0.8
+
+    # Fungal absorption at 1650 nm, as a contiguous slice
+    band = np.flatnonzero(abs(wavelengths - 1650) < 40)
+    fungal_band = slice(band[0], band[-1] + 1) if len(band) else slice(0, 0)
+
+    wavelengths.flags.writeable = False
+    base.flags.writeable = False
+    return wavelengths, base, fungal_band
+
+
+def _output_array(out, shape, dtype):
+    """Return ``out`` after checking its shape, or a new array of ``shape``."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    return out
+
 
 if __name__ == '__main__':
     # Generate sample data
@@ -0,0 +1,90 @@
+"""
+SHI/ARS training data: synthetic seed spectra with UAV, environment, field
+and storage features, split into train/val/test.
+
+The splits can be written once as .npy files and opened copy-on-write
+memory-mapped, so any number of worker processes share one copy of the data.
+"""
+
+import json
+import os
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from src.data.spectral_preprocessing import SpectralPreprocessor
+
+
+SEED_FIELDS = ('hyperspectral', 'uav', 'env', 'field', 'storage', 'shi', 'ars')
+SPLITS = ('train', 'val', 'test')
+
+
+def build_seed_health_dataset(generator, n_samples=2000, bin_nm=10):
+    """Build the SHI/ARS splits from ``generator`` (a DataGenerator or CachedGenerator).
+
+    Returns ``({split: {field: float32 array}}, spectral_prep)``; the spectra
+    are smoothed and binned by a SpectralPreprocessor fitted on the training split.
+    """
+    seed_spectra, wavelengths, seed_labels = generator.generate_hyperspectral_seed(n_samples=n_samples,
+                                                                                   dtype=np.float32)
+
+    # Create synthetic features
+    n_samples = len(seed_spectra)
+    uav_features = generator.rng.standard_normal((n_samples, 128))  # UAV-derived features
+    env_features = generator.rng.standard_normal((n_samples, 10))   # Environmental features
+
+    # SHI based on germination and infection
+    shi = seed_labels['germination_rate'] * 0.7 + (1 - seed_labels['fungal_presence']) * 30
+    shi = np.clip(shi, 0, 100)
+
+    # ARS based on aflatoxin
+    ars = np.clip(np.log(seed_labels['aflatoxin_ppb'] + 1) * 15, 0, 100)
+
+    # Field features (for ARS)
+    field_features = generator.rng.standard_normal((n_samples, 50))
+    storage_features = generator.rng.standard_normal((n_samples, 4))
+
+    # Split data
+    indices = np.arange(n_samples)
+    train_idx, test_idx = train_test_split(indices, test_size=0.2, random_state=42)
+    train_idx, val_idx = train_test_split(train_idx, test_size=0.2, random_state=42)
+
+    # Smooth and bin spectra (fitted on the training split)
+    spectral_prep = SpectralPreprocessor(bin_nm=bin_nm).fit(seed_spectra[train_idx], wavelengths)
+    seed_spectra = spectral_prep.transform(seed_spectra)
+
+    columns = dict(zip(SEED_FIELDS, (seed_spectra, uav_features, env_features, field_features, storage_features,
+                                     shi, ars)))
+    splits = {
+        name: {field: np.ascontiguousarray(values[idx], dtype=np.float32) for field, values in columns.items()}
+        for name, idx in zip(SPLITS, (train_idx, val_idx, test_idx))
+    }
+    return splits, spectral_prep
+
+
+def save_seed_health_dataset(directory, splits, spectral_prep=None):
+    """Write the splits as ``{split}/{field}.npy`` (plus the fitted preprocessor)."""
+    for name, fields in splits.items():
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+        for field, values in fields.items():
+            np.save(os.path.join(directory, name, f'{field}.npy'), values)
+    if spectral_prep is not None:
+        spectral_prep.save(os.path.join(directory, 'spectral_prep.npz'))
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({name: len(fields['shi']) for name, fields in splits.items()}, f)
+    return directory
+
+
+def load_seed_health_dataset(directory, mmap_mode='c'):
+    """Open splits written by ``save_seed_health_dataset``.
+
+    The default copy-on-write mapping shares pages between processes and is
+    writable, so ``torch.from_numpy`` wraps it without a copy.
+    """
+    with open(os.path.join(directory, 'meta.json')) as f:
+        names = list(json.load(f))
+    return {
+        name: {field: np.load(os.path.join(directory, name, f'{field}.npy'), mmap_mode=mmap_mode)
+               for field in SEED_FIELDS}
+        for name in names
+    }
@@ -0,0 +1,142 @@
+"""
+Spectral preprocessing for hyperspectral seed spectra.
+
+Reduces raw 1 nm spectra (2151 points over 400-2500 nm) to a short input for
+the 1-D CNN encoders: Savitzky-Golay smoothing, averaging into coarser bands,
+then optionally keeping only bands near the diagnostic absorption features or
+projecting onto incremental-PCA components.
+"""
+
+import json
+
+import numpy as np
+from scipy import signal
+
+
+# Water (1450, 1940 nm), fungal (1650 nm) and protein (2180 nm) absorption features
+ABSORPTION_FEATURES_NM = (1450, 1650, 1940, 2180)
+
+
+class SpectralPreprocessor:
+    """Fitted, serializable smoothing + band binning + ROI/PCA reduction."""
+
+    def __init__(self, smooth_window=11, smooth_polyorder=2, bin_nm=10, roi_half_width_nm=None,
+                 n_components=None, chunk_size=4096):
+        self.smooth_window = smooth_window
+        self.smooth_polyorder = smooth_polyorder
+        self.bin_nm = bin_nm
+        self.roi_half_width_nm = roi_half_width_nm
+        self.n_components = n_components
+        self.chunk_size = chunk_size
+
+        # Fitted state
+        self.n_wavelengths = None
+        self.bin_size = None
+        self.band_centers = None
+        self.band_mask = None
+        self.pca_mean = None
+        self.pca_components = None
+
+    @property
+    def output_dim(self):
+        """Length of the transformed spectra."""
+        if self.pca_components is not None:
+            return len(self.pca_components)
+        return int(self.band_mask.sum())
+
+    def fit(self, spectra, wavelengths):
+        """Fit the band layout (and PCA, if enabled) on training spectra [N, n_wavelengths]."""
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        self.n_wavelengths = len(wavelengths)
+        step = (wavelengths[-1] - wavelengths[0]) / (len(wavelengths) - 1)
+        self.bin_size = max(int(round(self.bin_nm / step)), 1) if self.bin_nm else 1
+
+        n_bands = self.n_wavelengths // self.bin_size
+        self.band_centers = wavelengths[:n_bands * self.bin_size].reshape(n_bands, self.bin_size).mean(axis=1)
+
+        if self.roi_half_width_nm:
+            distance = np.abs(self.band_centers[:, None] - np.array(ABSORPTION_FEATURES_NM)[None, :])
+            self.band_mask = distance.min(axis=1) <= self.roi_half_width_nm
+        else:
+            self.band_mask = np.ones(n_bands, dtype=bool)
+
+        self.pca_mean = None
+        self.pca_components = None
+        if self.n_components:
+            from sklearn.decomposition import IncrementalPCA
+
+            n_features = int(self.band_mask.sum())
+            if self.n_components > min(len(spectra), n_features):
+                raise ValueError(f"n_components={self.n_components} needs at least that many spectra and bands, "
+                                 f"got {len(spectra)} spectra with {n_features} bands")
+
+            # Every partial_fit batch needs at least n_components rows, so chunks are
+            # at least that long and a short remainder joins the previous chunk
+            step = max(self.chunk_size, self.n_components)
+            bounds = list(range(0, len(spectra), step)) + [len(spectra)]
+            if len(bounds) > 2 and bounds[-1] - bounds[-2] < self.n_components:
+                del bounds[-2]
+            pca = IncrementalPCA(n_components=self.n_components)
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                pca.partial_fit(self._reduce_bands(spectra[start:stop]))
+            self.pca_mean = pca.mean_.astype(np.float32)
+            self.pca_components = pca.components_.astype(np.float32)
+
+        return self
+
+    def transform(self, spectra):
+        """Reduce spectra [N, n_wavelengths] to float32 [N, output_dim], chunk by chunk."""
+        if len(spectra) and np.shape(spectra)[1] != self.n_wavelengths:
+            raise ValueError(f"expected {self.n_wavelengths} wavelengths, got {np.shape(spectra)[1]}")
+        out = np.empty((len(spectra), self.output_dim), dtype=np.float32)
+        for start in range(0, len(spectra), self.chunk_size):
+            reduced = self._reduce_bands(spectra[start:start + self.chunk_size])
+            if self.pca_components is not None:
+                reduced = (reduced - self.pca_mean) @ self.pca_components.T
+            out[start:start + self.chunk_size] = reduced
+        return out
+
+    def fit_transform(self, spectra, wavelengths):
+        return self.fit(spectra, wavelengths).transform(spectra)
+
+    def _reduce_bands(self, spectra):
+        """Smooth, bin and ROI-select one chunk of spectra."""
+        spectra = np.asarray(spectra, dtype=np.float32)
+        if self.smooth_window:
+            spectra = signal.savgol_filter(spectra, self.smooth_window, self.smooth_polyorder, axis=1)
+        n_bands = len(self.band_centers)
+        binned = spectra[:, :n_bands * self.bin_size].reshape(len(spectra), n_bands, self.bin_size).mean(axis=2)
+        return binned[:, self.band_mask].astype(np.float32)
+
+    def save(self, path):
+        """Write the configuration and fitted state to an .npz file."""
+        config = {
+            'smooth_window': self.smooth_window,
+            'smooth_polyorder': self.smooth_polyorder,
+            'bin_nm': self.bin_nm,
+            'roi_half_width_nm': self.roi_half_width_nm,
+            'n_components': self.n_components,
+            'chunk_size': self.chunk_size,
+            'n_wavelengths': self.n_wavelengths,
+            'bin_size': self.bin_size,
+        }
+        arrays = {'band_centers': self.band_centers, 'band_mask': self.band_mask}
+        if self.pca_components is not None:
+            arrays.update(pca_mean=self.pca_mean, pca_components=self.pca_components)
+        np.savez(path, config=json.dumps(config), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Rebuild a fitted preprocessor saved with ``save``."""
+        with np.load(path) as data:
+            config = json.loads(str(data['config']))
+            prep = cls(**{k: config[k] for k in ('smooth_window', 'smooth_polyorder', 'bin_nm',
+                                                 'roi_half_width_nm', 'n_components', 'chunk_size')})
+            prep.n_wavelengths = config['n_wavelengths']
+            prep.bin_size = config['bin_size']
+            prep.band_centers = data['band_centers']
+            prep.band_mask = data['band_mask']
+            if 'pca_components' in data:
+                prep.pca_mean = data['pca_mean']
+                prep.pca_components = data['pca_components']
+        return prep
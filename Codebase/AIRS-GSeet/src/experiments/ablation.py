@@ -0,0 +1,135 @@
+"""
+Modality ablations of the SHI/ARS models from cached encoder embeddings.
+
+Every encoder (``hyperspectral_encoder``, ``uav_encoder``, ``env_encoder``;
+``hyperspectral_branch``, ``field_branch``, ``storage_branch``) runs once over
+each split. For each ablation a fresh fusion head is then trained on those
+embeddings with one modality zeroed out, next to an unmasked head trained the
+same way, so the R² drop measures what that modality contributes without
+retraining any encoder.
+"""
+
+import copy
+
+import pandas as pd
+import torch
+
+from src.data.batch_dataset import batch_loader
+from src.models.metrics import RegressionMetrics
+from src.models.trainer import Trainer
+
+
+# (task, target, {modality: (encoder attribute, input field)}) in fusion_head argument order
+ABLATION_TASKS = (
+    ('SHI', 'shi', {
+        'hyperspectral': ('hyperspectral_encoder', 'hyperspectral'),
+        'uav': ('uav_encoder', 'uav'),
+        'env': ('env_encoder', 'env'),
+    }),
+    ('ARS', 'ars', {
+        'hyperspectral': ('hyperspectral_branch', 'hyperspectral'),
+        'field': ('field_branch', 'field'),
+        'storage': ('storage_branch', 'storage'),
+    }),
+)
+
+MODALITY_LABELS = {
+    'hyperspectral': 'Hyperspectral\nData',
+    'uav': 'UAV\nFeatures',
+    'env': 'Environment\nFeatures',
+    'field': 'Field\nConditions',
+    'storage': 'Storage\nConditions',
+}
+
+# Parts of a model that fusion_head uses
+HEAD_MODULES = ('modality_proj', 'modality_attention', 'fusion')
+
+
+def encode_modalities(model, encoders, data, batch_size=256):
+    """Embeddings [N, dim] of every modality of ``data`` (a dict of tensors).
+
+    ``encoders`` maps modality -> (encoder attribute, input field) as in ABLATION_TASKS.
+    """
+    model.eval()
+    embeddings = {modality: [] for modality in encoders}
+    with torch.no_grad():
+        for batch in batch_loader(data, batch_size=batch_size):
+            for modality, (encoder, field) in encoders.items():
+                x = batch[field]
+                if field == 'hyperspectral':
+                    x = x.unsqueeze(1)  # spectra enter the 1-D CNN as one channel
+                embeddings[modality].append(getattr(model, encoder)(x).float())
+    return {modality: torch.cat(chunks) for modality, chunks in embeddings.items()}
+
+
+def train_fusion_head(model, embeddings, targets, masked=(), epochs=50, batch_size=64, lr=1e-3, seed=0):
+    """A copy of ``model`` whose re-initialised fusion head was trained on ``embeddings``.
+
+    Modalities in ``masked`` are zeroed before the head sees them.
+    """
+    torch.manual_seed(seed)
+    model = copy.deepcopy(model)
+    head = [getattr(model, name) for name in HEAD_MODULES if hasattr(model, name)]
+    for module in head:
+        for layer in module.modules():
+            if hasattr(layer, 'reset_parameters'):
+                layer.reset_parameters()
+
+    modalities = list(embeddings)
+    train = {**_mask(embeddings, masked), 'target': targets}
+    optimizer = torch.optim.Adam([p for module in head for p in module.parameters()], lr=lr, weight_decay=1e-5)
+    criterion = torch.nn.MSELoss()
+
+    def step(batch):
+        return {'loss': criterion(model.fusion_head(*(batch[m] for m in modalities)), batch['target'])}
+
+    trainer = Trainer(step, [optimizer])
+    loader = batch_loader(train, batch_size=batch_size, shuffle=True, generator=torch.Generator().manual_seed(seed))
+    model.train()
+    for _ in range(epochs):
+        trainer.train_epoch(loader)
+    return model.eval()
+
+
+def evaluate_fusion_head(model, embeddings, targets, masked=()):
+    """Test metrics of ``model.fusion_head`` on (masked) embeddings."""
+    embeddings = _mask(embeddings, masked)
+    metrics = RegressionMetrics()
+    with torch.no_grad():
+        metrics.update(model.fusion_head(*embeddings.values()), targets)
+    return metrics.compute()
+
+
+def run_modality_ablation(shi_model, ars_model, train_data, test_data, epochs=50, seed=0):
+    """R² of the SHI/ARS fusion heads with each modality masked, against no mask.
+
+    ``train_data``/``test_data`` are dicts of tensors with the keys used by
+    train_seed_models. Returns one row per (model, masked modality).
+    """
+    rows = []
+    for (task, target, encoders), model in zip(ABLATION_TASKS, (shi_model, ars_model)):
+        model = copy.deepcopy(model).cpu()
+        # Encoders run once per split; every ablation reuses these embeddings
+        train_embeddings = encode_modalities(model, encoders, train_data)
+        test_embeddings = encode_modalities(model, encoders, test_data)
+
+        baseline = None
+        for masked in (None,) + tuple(encoders):
+            masks = () if masked is None else (masked,)
+            head = train_fusion_head(model, train_embeddings, train_data[target].float(), masks, epochs, seed=seed)
+            r2 = evaluate_fusion_head(head, test_embeddings, test_data[target], masks)['r2']
+            if baseline is None:
+                baseline = r2
+            rows.append({'Model': task, 'Masked': masked or 'none', 'R2': r2, 'R2_Drop': baseline - r2})
+    return pd.DataFrame(rows)
+
+
+def ablation_table(results):
+    """Per-modality R² drops as a [modality x SHI/ARS] frame (NaN where a model lacks the modality)."""
+    drops = results[results['Masked'] != 'none'].pivot(index='Masked', columns='Model', values='R2_Drop')
+    order = [m for m in MODALITY_LABELS if m in drops.index]
+    return drops.reindex(index=order, columns=['SHI', 'ARS'])
+
+
+def _mask(embeddings, masked):
+    return {m: torch.zeros_like(e) if m in masked else e for m, e in embeddings.items()}
@@ -0,0 +1,161 @@
+"""
+Hyperparameter sweeps over the SHI/ARS seed health models.
+
+The dataset is built once and written as .npy splits; every worker process
+maps the same files copy-on-write instead of receiving its own pickled copy.
+Configurations train concurrently across a process pool (one or a few
+intra-op threads each) and the results are written to a CSV table.
+
+    python -m src.experiments.sweep --workers 4 --epochs 30
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.data.batch_dataset import batch_loader
+from src.data.cache import CachedGenerator, GeneratorCache
+from src.data.data_generator import DataGenerator
+from src.data.seed_dataset import build_seed_health_dataset, load_seed_health_dataset, save_seed_health_dataset
+from src.models.metrics import RegressionMetrics
+from src.models.seed_health_model import SeedHealthModel, AflatoxinRiskModel, train_seed_models
+
+
+CACHE_DIR = '.cache/airs_gseed'
+# Derived splits live outside the generator cache, whose manifest does not track them
+DATA_DIR = 'results/sweep_data'
+
+# Values used for every key a configuration leaves out
+DEFAULT_CONFIG = {
+    'lr': 1e-3,
+    'weight_decay': 1e-5,
+    'hidden_dim': 256,
+    'fusion': 'concat',
+    'joint': True,
+    'batch_size': 32,
+    'precision': 'fp32',
+    'seed': 0,
+}
+
+DEFAULT_GRID = {
+    'lr': (3e-4, 1e-3, 3e-3),
+    'hidden_dim': (128, 256),
+    'fusion': ('concat', 'attention'),
+}
+
+
+def expand_grid(grid):
+    """Every combination of a ``{key: values}`` grid, as a list of configs."""
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def prepare_sweep_data(data_dir=DATA_DIR, n_samples=2000, seed=42, rebuild=False):
+    """Build and save the SHI/ARS splits to ``data_dir`` unless they already exist."""
+    if rebuild or not os.path.exists(os.path.join(data_dir, 'meta.json')):
+        gen = CachedGenerator(DataGenerator(seed=seed), GeneratorCache(CACHE_DIR))
+        splits, spectral_prep = build_seed_health_dataset(gen, n_samples=n_samples)
+        save_seed_health_dataset(data_dir, splits, spectral_prep)
+    return data_dir
+
+
+def train_config(data_dir, config, epochs=30, threads=1):
+    """Train one SHI/ARS pair on the saved splits and score it on the test split."""
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"unknown sweep keys {sorted(unknown)}")
+    params = {**DEFAULT_CONFIG, **config}
+    torch.set_num_threads(threads)
+    torch.manual_seed(params['seed'])
+
+    data = {name: {field: torch.from_numpy(values) for field, values in fields.items()}
+            for name, fields in load_seed_health_dataset(data_dir).items()}
+    hyperspectral_dim = data['train']['hyperspectral'].shape[1]
+    shi_model = SeedHealthModel(hyperspectral_dim=hyperspectral_dim, hidden_dim=params['hidden_dim'],
+                                fusion=params['fusion'])
+    ars_model = AflatoxinRiskModel(hyperspectral_dim=hyperspectral_dim, hidden_dim=params['hidden_dim'])
+
+    train_loader = batch_loader(data['train'], batch_size=params['batch_size'], shuffle=True,
+                                generator=torch.Generator().manual_seed(params['seed']))
+    val_loader = batch_loader(data['val'], batch_size=256)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        best_shi_r2, best_ars_r2 = train_seed_models(
+            shi_model, ars_model, train_loader, val_loader, epochs=epochs, joint=params['joint'],
+            precision=params['precision'], checkpoint_dir=checkpoint_dir, keep_best=1,
+            lr=params['lr'], weight_decay=params['weight_decay']
+        )
+    train_seconds = time.perf_counter() - start
+
+    shi_model.eval()
+    ars_model.eval()
+    shi_metrics = RegressionMetrics()
+    ars_metrics = RegressionMetrics()
+    with torch.no_grad():
+        for batch in batch_loader(data['test'], batch_size=256):
+            shi_metrics.update(shi_model(batch['hyperspectral'], batch['uav'], batch['env']), batch['shi'])
+            ars_metrics.update(ars_model(batch['hyperspectral'], batch['field'], batch['storage']), batch['ars'])
+    shi_results = shi_metrics.compute()
+    ars_results = ars_metrics.compute()
+
+    return {
+        **params,
+        'val_shi_r2': best_shi_r2,
+        'val_ars_r2': best_ars_r2,
+        'test_shi_r2': shi_results['r2'],
+        'test_shi_rmse': shi_results['rmse'],
+        'test_ars_r2': ars_results['r2'],
+        'test_ars_rmse': ars_results['rmse'],
+        'train_seconds': train_seconds,
+    }
+
+
+def run_sweep(configs, data_dir=DATA_DIR, results_path='results/seed_sweep.csv', workers=None, epochs=30,
+              threads_per_worker=1):
+    """Train ``configs`` across a process pool and write one results row per config.
+
+    Workers are spawned (not forked) so none inherits the parent's OpenMP
+    thread pool.
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(train_config, data_dir, config, epochs, threads_per_worker) for config in configs]
+        rows = [future.result() for future in futures]
+
+    results = pd.DataFrame(rows)
+    if results_path:
+        os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+        results.to_csv(results_path, index=False)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep SHI/ARS hyperparameters over DEFAULT_GRID.')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--rebuild-data', action='store_true', help='regenerate the saved splits')
+    parser.add_argument('--out', default='results/seed_sweep.csv')
+    args = parser.parse_args()
+
+    prepare_sweep_data(args.data_dir, rebuild=args.rebuild_data)
+    configs = expand_grid(DEFAULT_GRID)
+    print(f"Training {len(configs)} configurations...")
+    results = run_sweep(configs, args.data_dir, args.out, args.workers, args.epochs, args.threads_per_worker)
+    print(results.sort_values('test_shi_r2', ascending=False).to_string(index=False, float_format='%.4f'))
+
+
+if __name__ == '__main__':
+    main()
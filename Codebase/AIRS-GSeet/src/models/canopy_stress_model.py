@@ -2,36 +2,73 @@
 Canopy stress detection model: CNN-ViT hybrid architecture.
 """
 
+import time
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 from torchvision import models
 
+from src.models.checkpoint import CheckpointManager
+from src.models.metrics import ClassificationMetrics
+from src.models.trainer import Trainer
+
+
+# Model configurations; 'lite' feeds the transformer from the CNN feature map
+# (one backbone pass, 64 tokens at 256x256) with a smaller backbone and width
+CANOPY_VARIANTS = {
+    'full': {},
+    'lite': dict(backbone='resnet18', tokenizer='cnn', embed_dim=256, num_heads=8, num_layers=4),
+}
+
 
 class CNNViTHybrid(nn.Module):
-    """Hybrid CNN-ViT model for canopy stress detection."""
+    """Hybrid CNN-ViT model for canopy stress detection.
+
+    ``tokenizer='patch'`` runs the ViT on its own 16x16 image patches alongside the
+    CNN; ``tokenizer='cnn'`` uses the projected CNN feature map as the ViT tokens,
+    so the image is only processed once.
+
+    The backbone starts from ImageNet weights downloaded by torchvision when
+    ``pretrained`` is True, from a local backbone state dict when
+    ``backbone_weights`` is a path, and from random init otherwise. Use
+    ``from_checkpoint`` to load a trained model without any of these.
+    """
     
-    def __init__(self, num_classes=4, img_size=256, patch_size=16, embed_dim=768, num_heads=12, num_layers=6):
+    def __init__(self, num_classes=4, img_size=256, patch_size=16, embed_dim=768, num_heads=12, num_layers=6,
+                 backbone='resnet50', tokenizer='patch', pretrained=True, backbone_weights=None):
         super(CNNViTHybrid, self).__init__()
+        if tokenizer not in ('patch', 'cnn'):
+            raise ValueError(f"tokenizer must be 'patch' or 'cnn', got {tokenizer!r}")
         
-        # CNN backbone (ResNet-50)
-        resnet = models.resnet50(pretrained=True)
+        # CNN backbone (ResNet)
+        download = pretrained and backbone_weights is None
+        resnet = getattr(models, backbone)(weights='DEFAULT' if download else None)
+        if backbone_weights is not None:
+            resnet.load_state_dict(torch.load(backbone_weights, map_location='cpu', weights_only=True))
         self.cnn_backbone = nn.Sequential(*list(resnet.children())[:-2])
-        cnn_feat_dim = 2048
+        cnn_feat_dim = resnet.fc.in_features
         
         # Reduce CNN features
         self.cnn_proj = nn.Conv2d(cnn_feat_dim, embed_dim, kernel_size=1)
         
         # ViT components
+        self.tokenizer = tokenizer
         self.patch_size = patch_size
-        self.num_patches = (img_size // patch_size) ** 2
         self.embed_dim = embed_dim
         
-        # Patch embedding
-        self.patch_embed = nn.Conv2d(3, embed_dim, kernel_size=patch_size, stride=patch_size)
+        if tokenizer == 'patch':
+            self.grid_size = img_size // patch_size
+            # Patch embedding
+            self.patch_embed = nn.Conv2d(3, embed_dim, kernel_size=patch_size, stride=patch_size)
+        else:
+            # ResNet feature maps have stride 32
+            self.grid_size = -(-img_size // 32)
+        self.num_patches = self.grid_size ** 2
         
-        # Positional embedding
+        # Positional embedding, learned for img_size and interpolated for other input sizes
         self.pos_embed = nn.Parameter(torch.randn(1, self.num_patches, embed_dim))
+        self._pos_embed_cache = {}
         
         # Transformer encoder
         encoder_layer = nn.TransformerEncoderLayer(
@@ -51,20 +88,66 @@ class CNNViTHybrid(nn.Module):
             nn.Linear(embed_dim, num_classes)
         )
         
+    @classmethod
+    def from_checkpoint(cls, path, map_location='cpu', **kwargs):
+        """Load a trained model from a checkpoint (e.g. ``checkpoints/canopy_best.pt``) or plain state-dict file.
+
+        ``kwargs`` must describe the same architecture the checkpoint was saved
+        from. Modules are created on the meta device, so neither the pretrained
+        download nor random weight initialisation happens; the checkpoint tensors
+        are assigned directly.
+        """
+        state_dict = torch.load(path, map_location=map_location, weights_only=True)
+        if isinstance(state_dict.get('model'), dict):
+            state_dict = state_dict['model']
+        with torch.device('meta'):
+            model = cls(**{**kwargs, 'pretrained': False, 'backbone_weights': None})
+        model.load_state_dict(state_dict, assign=True)
+        return model
+        
+    def _pos_embed_for(self, height, width):
+        """Positional embedding for a [height, width] token grid.
+
+        Other grid sizes than the trained one are bicubically interpolated. When
+        no gradient can flow to pos_embed the result is cached per size, and
+        invalidated once pos_embed is updated or replaced; training passes never
+        read the cache.
+        """
+        if (height, width) == (self.grid_size, self.grid_size):
+            return self.pos_embed
+        
+        # The cached tensor is detached, so it is only valid where no gradient must reach pos_embed
+        cacheable = not (torch.is_grad_enabled() and self.pos_embed.requires_grad)
+        version = (self.pos_embed._version, self.pos_embed.data_ptr())
+        if cacheable:
+            cached = self._pos_embed_cache.get((height, width))
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        
+        pos = self.pos_embed.reshape(1, self.grid_size, self.grid_size, self.embed_dim).permute(0, 3, 1, 2)
+        pos = F.interpolate(pos, size=(height, width), mode='bicubic', align_corners=False)
+        pos = pos.flatten(2).transpose(1, 2)  # [1, height * width, embed_dim]
+        if cacheable:
+            self._pos_embed_cache[(height, width)] = (version, pos)
+        return pos
+        
     def forward(self, x):
         # CNN features
-        cnn_feat = self.cnn_backbone(x)  # [B, 2048, H', W']
-        cnn_feat = self.cnn_proj(cnn_feat)  # [B, embed_dim, H', W']
-        cnn_feat = F.adaptive_avg_pool2d(cnn_feat, (1, 1)).flatten(1)  # [B, embed_dim]
+        cnn_map = self.cnn_backbone(x)  # [B, C, H', W']
+        cnn_map = self.cnn_proj(cnn_map)  # [B, embed_dim, H', W']
+        cnn_feat = F.adaptive_avg_pool2d(cnn_map, (1, 1)).flatten(1)  # [B, embed_dim]
         
         # ViT features
-        # Patch embedding
-        patches = self.patch_embed(x)  # [B, embed_dim, H/p, W/p]
+        if self.tokenizer == 'patch':
+            # Patch embedding
+            patches = self.patch_embed(x)  # [B, embed_dim, H/p, W/p]
+        else:
+            patches = cnn_map
         B, C, H, W = patches.shape
         patches = patches.flatten(2).transpose(1, 2)  # [B, num_patches, embed_dim]
         
         # Add positional embedding
-        patches = patches + self.pos_embed
+        patches = patches + self._pos_embed_for(H, W)
         
         # Transformer
         vit_feat = self.transformer(patches)  # [B, num_patches, embed_dim]
@@ -79,56 +162,128 @@ class CNNViTHybrid(nn.Module):
         return logits
 
 
-def train_canopy_model(model, train_loader, val_loader, epochs=50, device='cpu'):
-    """Train the canopy stress detection model."""
+def build_canopy_model(variant='full', **kwargs):
+    """Build a CNNViTHybrid from a CANOPY_VARIANTS preset, with keyword overrides."""
+    return CNNViTHybrid(**{**CANOPY_VARIANTS[variant], **kwargs})
+
+
+def benchmark_canopy_model(model, loader, device='cpu', warmup_batches=2):
+    """Measure inference throughput and accuracy of a canopy model over a loader of (images, labels).
+
+    Only forward passes are timed: with host timers on CPU and CUDA events on
+    GPU. Correct counts stay on the device, so the device is synchronised once
+    at the end rather than per batch.
+    """
+    model.eval()
+    cuda = torch.device(device).type == 'cuda'
+    correct = torch.zeros((), dtype=torch.long, device=device)
+    total = 0
+    timings = []  # seconds per batch on CPU, (start, end) events on CUDA
+    with torch.no_grad():
+        for batch_idx, (data, target) in enumerate(loader):
+            data, target = data.to(device), target.to(device)
+            if batch_idx < warmup_batches:
+                model(data)
+            if cuda:
+                start, end = torch.cuda.Event(enable_timing=True), torch.cuda.Event(enable_timing=True)
+                start.record()
+                output = model(data)
+                end.record()
+                timings.append((start, end))
+            else:
+                start = time.perf_counter()
+                output = model(data)
+                timings.append(time.perf_counter() - start)
+            correct += (output.argmax(dim=1) == target).sum()
+            total += target.size(0)
+    
+    if cuda:
+        torch.cuda.synchronize()
+        elapsed = sum(start.elapsed_time(end) for start, end in timings) / 1000
+    else:
+        elapsed = sum(timings)
+    
+    return {
+        'params_m': sum(p.numel() for p in model.parameters()) / 1e6,
+        'images_per_s': total / elapsed,
+        'ms_per_image': 1000 * elapsed / total,
+        'accuracy': correct.item() / total,
+    }
+
+
+def train_canopy_model(model, train_loader, val_loader, epochs=50, device='cpu', precision='fp32', accumulation_steps=1,
+                       checkpoint_dir='checkpoints', keep_best=3, resume=False):
+    """Train the canopy stress detection model.
+
+    ``precision='bf16'`` runs forward passes under bfloat16 autocast and
+    ``accumulation_steps`` > 1 steps the optimizer once per that many batches.
+    The ``keep_best`` best epochs by validation accuracy and the last training
+    state are checkpointed to ``checkpoint_dir`` in the background;
+    ``resume=True`` continues from the last state found there.
+    """
     criterion = nn.CrossEntropyLoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=1e-4, weight_decay=1e-5)
     scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode='min', factor=0.5, patience=5)
     
+    def step(batch):
+        data, target = batch
+        return {'loss': criterion(model(data), target)}
+    
+    trainer = Trainer(step, [optimizer], device, precision, accumulation_steps)
+    
     best_val_acc = 0.0
     train_losses = []
     val_accs = []
     
-    for epoch in range(epochs):
+    checkpoints = CheckpointManager(checkpoint_dir, keep_best=keep_best, mode='max')
+    start_epoch = 0
+    if not resume:
+        checkpoints.reset('canopy')  # don't mix in best-k checkpoints of an earlier run
+    state = checkpoints.load_last('canopy') if resume else None
+    if state is not None:
+        model.load_state_dict(state['model'])
+        optimizer.load_state_dict(state['optimizer'])
+        scheduler.load_state_dict(state['scheduler'])
+        best_val_acc = state['best_val_acc']
+        train_losses = state['train_losses']
+        val_accs = state['val_accs']
+        start_epoch = state['epoch'] + 1
+        torch.set_rng_state(state['rng_state'])
+    
+    for epoch in range(start_epoch, epochs):
         # Training
         model.train()
-        train_loss = 0.0
-        for batch_idx, (data, target) in enumerate(train_loader):
-            data, target = data.to(device), target.to(device)
-            
-            optimizer.zero_grad()
-            output = model(data)
-            loss = criterion(output, target)
-            loss.backward()
-            optimizer.step()
-            
-            train_loss += loss.item()
-        
-        train_loss /= len(train_loader)
+        train_loss = trainer.train_epoch(train_loader)['loss']
         train_losses.append(train_loss)
         
         # Validation
         model.eval()
-        val_correct = 0
-        val_total = 0
-        with torch.no_grad():
+        val_metrics = ClassificationMetrics()
+        with torch.no_grad(), trainer.autocast():
             for data, target in val_loader:
                 data, target = data.to(device), target.to(device)
-                output = model(data)
-                _, predicted = torch.max(output.data, 1)
-                val_total += target.size(0)
-                val_correct += (predicted == target).sum().item()
+                val_metrics.update(model(data), target)
         
-        val_acc = val_correct / val_total
+        val_acc = val_metrics.compute()['accuracy']
         val_accs.append(val_acc)
         
         scheduler.step(train_loss)
         
-        if val_acc > best_val_acc:
-            best_val_acc = val_acc
-            torch.save(model.state_dict(), 'best_canopy_model.pth')
+        best_val_acc = max(best_val_acc, val_acc)
+        checkpoints.save_best('canopy', epoch, val_acc, {'model': model.state_dict()})
+        checkpoints.save_last('canopy', epoch, {
+            'epoch': epoch,
+            'model': model.state_dict(),
+            'optimizer': optimizer.state_dict(),
+            'scheduler': scheduler.state_dict(),
+            'best_val_acc': best_val_acc,
+            'train_losses': train_losses,
+            'val_accs': val_accs,
+            'rng_state': torch.get_rng_state()
+        })
         
         if (epoch + 1) % 10 == 0:
             print(f'Epoch {epoch+1}/{epochs}, Train Loss: {train_loss:.4f}, Val Acc: {val_acc:.4f}')
     
+    checkpoints.close()
     return train_losses, val_accs, best_val_acc
@@ -0,0 +1,182 @@
+"""
+Non-blocking checkpointing with best-k retention and resume.
+
+``CheckpointManager`` snapshots state dicts to CPU memory on the training
+thread and writes them from a background thread, so a slow disk never stalls
+the epoch loop. Every file is written to a temporary name and renamed into
+place, so a preempted run never leaves a truncated checkpoint behind.
+
+Layout of ``directory`` per tag (e.g. ``'shi'``):
+    {tag}_last.pt           latest resumable training state
+    {tag}_best_e{N}.pt      the ``keep_best`` best checkpoints by metric
+    {tag}_best.pt           the best of those (hard link or copy)
+    checkpoints.json        index of the above with epochs and metrics
+"""
+
+import glob
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+
+class CheckpointManager:
+    """Background-thread checkpoint writer keeping the last and the best-k checkpoints.
+
+    ``mode`` is ``'max'`` when a higher metric is better (R², accuracy) and
+    ``'min'`` otherwise. At most ``max_pending`` snapshots wait in memory for
+    the writer; a further save blocks until the oldest one is on disk.
+    """
+
+    def __init__(self, directory, keep_best=3, mode='max', max_pending=2):
+        if mode not in ('max', 'min'):
+            raise ValueError(f"mode must be 'max' or 'min', got {mode!r}")
+        self.directory = directory
+        self.keep_best = keep_best
+        self.mode = mode
+        self.max_pending = max_pending
+        os.makedirs(directory, exist_ok=True)
+
+        self.index_path = os.path.join(directory, 'checkpoints.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+
+    def path(self, tag, kind='last'):
+        """Path of ``{tag}_last.pt`` or ``{tag}_best.pt``."""
+        return os.path.join(self.directory, f'{tag}_{kind}.pt')
+
+    def is_better(self, tag, metric):
+        """Whether ``metric`` would enter the best-k of ``tag``."""
+        best = self.index.get(tag, {}).get('best', [])
+        if len(best) < self.keep_best:
+            return True
+        worst = best[-1]['metric']
+        return metric > worst if self.mode == 'max' else metric < worst
+
+    def save_last(self, tag, epoch, state):
+        """Queue ``state`` (e.g. model/optimizer/scheduler state dicts) as the resumable ``{tag}_last.pt``."""
+        entry = self.index.setdefault(tag, {'best': []})
+        entry['last'] = {'epoch': epoch, 'path': os.path.basename(self.path(tag))}
+        self._submit(self._write_last, self.path(tag), _snapshot(state), _snapshot(self.index))
+
+    def save_best(self, tag, epoch, metric, state):
+        """Queue ``state`` as a best-k checkpoint if ``metric`` qualifies; returns whether it did.
+
+        The state is only copied when it is kept, so this is cheap to call every epoch.
+        """
+        metric = float(metric)
+        if not self.is_better(tag, metric):
+            return False
+
+        entry = self.index.setdefault(tag, {'best': []})
+        path = os.path.join(self.directory, f'{tag}_best_e{epoch:04d}.pt')
+        best = [b for b in entry['best'] if b['path'] != os.path.basename(path)]
+        best.append({'epoch': epoch, 'metric': metric, 'path': os.path.basename(path)})
+        best.sort(key=lambda b: b['metric'], reverse=self.mode == 'max')
+        entry['best'] = best[:self.keep_best]
+        pruned = [os.path.join(self.directory, b['path']) for b in best[self.keep_best:]]
+        top = os.path.join(self.directory, entry['best'][0]['path'])
+
+        self._submit(self._write_best, path, _snapshot(state), top, self.path(tag, 'best'), pruned,
+                     _snapshot(self.index))
+        return True
+
+    def reset(self, *tags):
+        """Forget ``tags`` and delete their checkpoint files, so a fresh run starts an empty best-k."""
+        self.wait()
+        for tag in tags:
+            self.index.pop(tag, None)
+            for pattern in (f'{tag}_last.pt*', f'{tag}_best.pt*', f'{tag}_best_e[0-9]*.pt*'):
+                for path in glob.glob(os.path.join(glob.escape(self.directory), pattern)):
+                    os.remove(path)
+        self._write_index(self.index)
+
+    def load_last(self, tag, map_location='cpu'):
+        """The last saved state of ``tag``, or None if there is none."""
+        self.wait()
+        path = self.path(tag)
+        if not os.path.exists(path):
+            return None
+        return torch.load(path, map_location=map_location, weights_only=True)
+
+    def wait(self):
+        """Block until every queued checkpoint is written; re-raises writer errors."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Flush queued checkpoints and stop the writer thread."""
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _submit(self, fn, *args):
+        # Surface earlier write errors and bound the snapshots held in memory
+        while self._pending and (self._pending[0].done() or len(self._pending) >= self.max_pending):
+            self._pending.pop(0).result()
+        self._pending.append(self._executor.submit(fn, *args))
+
+    def _write_last(self, path, state, index):
+        _atomic_save(state, path)
+        self._write_index(index)
+
+    def _write_best(self, path, state, top, alias, pruned, index):
+        _atomic_save(state, path)
+        # rename() is a no-op between two links to the same file, so skip an unchanged alias
+        if not (os.path.exists(alias) and os.path.samefile(top, alias)):
+            tmp = alias + '.tmp'
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            try:
+                os.link(top, tmp)
+            except OSError:
+                shutil.copyfile(top, tmp)
+            os.replace(tmp, alias)
+        for old in pruned:
+            if os.path.exists(old):
+                os.remove(old)
+        self._write_index(index)
+
+    def _write_index(self, index):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+
+def load_model_weights(model, path, key='model', map_location='cpu'):
+    """Load a plain state dict or the ``key`` entry of a checkpoint into ``model``."""
+    state = torch.load(path, map_location=map_location, weights_only=True)
+    if key in state and isinstance(state[key], dict):
+        state = state[key]
+    return model.load_state_dict(state)
+
+
+def _atomic_save(obj, path):
+    tmp = path + '.tmp'
+    torch.save(obj, tmp)
+    os.replace(tmp, path)
+
+
+def _snapshot(obj):
+    """Deep copy of a (nested) state dict with every tensor cloned to CPU memory."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return type(obj)((k, _snapshot(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_snapshot(v) for v in obj)
+    return obj
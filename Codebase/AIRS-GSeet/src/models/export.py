@@ -0,0 +1,147 @@
+"""
+TorchScript / ONNX export of the AIRS-GSeed models and a fast CPU runtime.
+
+Models are exported with a dynamic batch axis, checked for numerical parity
+against eager mode, and reloaded through ``load_exported``: TorchScript graphs
+are frozen and optimised for inference (conv/bias folding, op fusion), ONNX
+graphs run on onnxruntime with all graph optimisations enabled. Both take an
+explicit thread count.
+"""
+
+import os
+
+import numpy as np
+import torch
+
+from src.models.canopy_stress_model import CNNViTHybrid
+from src.models.seed_health_model import SeedHealthModel, AflatoxinRiskModel
+
+
+def input_names(model):
+    """Names of the forward() inputs of an AIRS-GSeed model."""
+    if isinstance(model, SeedHealthModel):
+        return ['hyperspectral', 'uav', 'env']
+    if isinstance(model, AflatoxinRiskModel):
+        return ['hyperspectral', 'field', 'storage']
+    if isinstance(model, CNNViTHybrid):
+        return ['image']
+    raise TypeError(f"no export signature for {type(model).__name__}")
+
+
+def example_inputs(model, batch_size=2, hyperspectral_dim=None):
+    """Random inputs matching the forward() signature of an AIRS-GSeed model.
+
+    Spectra default to the model's own ``hyperspectral_dim`` (e.g. the binned
+    length it was trained on).
+    """
+    if hyperspectral_dim is None:
+        hyperspectral_dim = getattr(model, 'hyperspectral_dim', 2151)
+    if isinstance(model, SeedHealthModel):
+        return (torch.randn(batch_size, hyperspectral_dim),
+                torch.randn(batch_size, model.uav_encoder[0].in_features),
+                torch.randn(batch_size, model.env_encoder[0].in_features))
+    if isinstance(model, AflatoxinRiskModel):
+        return (torch.randn(batch_size, hyperspectral_dim),
+                torch.randn(batch_size, model.field_branch[0].in_features),
+                torch.randn(batch_size, model.storage_branch[0].in_features))
+    if isinstance(model, CNNViTHybrid):
+        stride = model.patch_size if model.tokenizer == 'patch' else 32
+        img_size = model.grid_size * stride
+        return (torch.rand(batch_size, 3, img_size, img_size),)
+    raise TypeError(f"no export signature for {type(model).__name__}")
+
+
+def export_torchscript(model, path, inputs=None):
+    """Trace ``model`` in eval mode and save it as TorchScript."""
+    model = model.eval()
+    inputs = inputs if inputs is not None else example_inputs(model)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, inputs, check_trace=False)
+    traced.save(path)
+    return path
+
+
+def export_onnx(model, path, inputs=None, opset_version=18):
+    """Export ``model`` to ONNX with a dynamic batch axis on every input and the output."""
+    model = model.eval()
+    inputs = inputs if inputs is not None else example_inputs(model)
+    names = input_names(model)
+    dynamic_axes = {name: {0: 'batch'} for name in names + ['output']}
+    with torch.no_grad():
+        torch.onnx.export(model, inputs, path, input_names=names, output_names=['output'],
+                          dynamic_axes=dynamic_axes, opset_version=opset_version)
+    return path
+
+
+class ExportedModel:
+    """Callable runtime for an exported ``.pt`` (TorchScript) or ``.onnx`` graph."""
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.backend = 'onnx' if path.endswith('.onnx') else 'torchscript'
+        if self.backend == 'onnx':
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+                options.inter_op_num_threads = 1
+            self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+            self.input_names = [i.name for i in self.session.get_inputs()]
+        else:
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            module = torch.jit.load(path, map_location='cpu').eval()
+            self.module = torch.jit.optimize_for_inference(module)
+
+    def __call__(self, *inputs):
+        if self.backend == 'onnx':
+            feed = {name: np.ascontiguousarray(_to_numpy(x), dtype=np.float32)
+                    for name, x in zip(self.input_names, inputs)}
+            return torch.from_numpy(self.session.run(None, feed)[0])
+        with torch.inference_mode():
+            return self.module(*(torch.as_tensor(x, dtype=torch.float32) for x in inputs))
+
+
+def load_exported(path, num_threads=None):
+    """Load an exported model for fast CPU inference."""
+    return ExportedModel(path, num_threads)
+
+
+def check_parity(model, exported, inputs=None, atol=1e-4, rtol=1e-4):
+    """Compare an exported model with eager ``model`` on ``inputs``.
+
+    Returns the maximum absolute difference and whether it is within tolerance.
+    """
+    model = model.eval()
+    inputs = inputs if inputs is not None else example_inputs(model, batch_size=3)
+    with torch.no_grad():
+        expected = model(*inputs)
+    actual = exported(*inputs)
+    max_abs_diff = (expected - actual).abs().max().item()
+    return {'max_abs_diff': max_abs_diff, 'ok': torch.allclose(expected, actual, atol=atol, rtol=rtol)}
+
+
+def export_all(models, directory='exported', formats=('torchscript', 'onnx'), **input_kwargs):
+    """Export a ``{name: model}`` dict to every format, checking parity; returns a report per file.
+
+    ``input_kwargs`` go to example_inputs; spectra default to each model's hyperspectral_dim.
+    """
+    os.makedirs(directory, exist_ok=True)
+    report = {}
+    for name, model in models.items():
+        inputs = example_inputs(model, **input_kwargs)
+        for fmt in formats:
+            if fmt == 'onnx':
+                path = export_onnx(model, os.path.join(directory, f'{name}.onnx'), inputs)
+            else:
+                path = export_torchscript(model, os.path.join(directory, f'{name}.pt'), inputs)
+            # Parity on a different batch size exercises the dynamic batch axis
+            check_inputs = example_inputs(model, batch_size=5, **input_kwargs)
+            report[path] = check_parity(model, load_exported(path), check_inputs)
+    return report
+
+
+def _to_numpy(x):
+    return x.detach().cpu().numpy() if isinstance(x, torch.Tensor) else np.asarray(x)
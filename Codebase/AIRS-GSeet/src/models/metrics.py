@@ -0,0 +1,110 @@
+"""
+Streaming evaluation metrics computed in torch.
+
+Each metric keeps running sufficient statistics on the device of the
+predictions, so ``update`` never synchronises with the host; ``compute``
+reads them back once and returns plain floats.
+"""
+
+import torch
+
+
+class RegressionMetrics:
+    """Running R², RMSE, MAE and Pearson correlation.
+
+    Sums are kept in float64 so the one-pass variance terms stay accurate
+    over large evaluation sets.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # n, sum y, sum y², sum p, sum p², sum py, sum (y-p)², sum |y-p|
+        self.stats = None
+
+    def update(self, preds, targets):
+        preds = preds.detach().reshape(-1).double()
+        targets = targets.detach().to(preds.device).reshape(-1).double()
+        errors = targets - preds
+        batch = torch.stack([
+            torch.tensor(float(len(preds)), dtype=torch.float64, device=preds.device),
+            targets.sum(), (targets * targets).sum(),
+            preds.sum(), (preds * preds).sum(), (preds * targets).sum(),
+            (errors * errors).sum(), errors.abs().sum()
+        ])
+        self.stats = batch if self.stats is None else self.stats + batch
+
+    def compute(self):
+        if self.stats is None:
+            raise ValueError("no predictions to compute metrics on")
+        n, sy, syy, sp, spp, spy, sse, sae = self.stats.tolist()
+        var_y = syy - sy * sy / n
+        var_p = spp - sp * sp / n
+        cov = spy - sp * sy / n
+        return {
+            'r2': 1 - sse / var_y if var_y > 0 else float('nan'),
+            'rmse': (sse / n) ** 0.5,
+            'mae': sae / n,
+            'corr': cov / (var_y * var_p) ** 0.5 if var_y > 0 and var_p > 0 else float('nan'),
+        }
+
+
+class ClassificationMetrics:
+    """Running accuracy, F1 and ROC AUC from logits.
+
+    ``num_classes`` defaults to the width of the first logits seen. F1 is
+    that of ``positive_class`` for two classes and macro-averaged
+    otherwise. AUC is one-vs-rest for ``positive_class``, from histograms of
+    its softmax probability over ``n_bins`` equal-width bins (ties within a bin
+    count half, as in the exact rank statistic).
+    """
+
+    def __init__(self, num_classes=None, positive_class=1, n_bins=1000):
+        self.num_classes = num_classes
+        self.positive_class = positive_class
+        self.n_bins = n_bins
+        self.reset()
+
+    def reset(self):
+        self.confusion = None
+        self.histograms = None
+
+    def update(self, logits, targets):
+        logits = logits.detach().float()
+        targets = targets.detach().to(logits.device).reshape(-1).long()
+        if self.confusion is None:
+            self.num_classes = self.num_classes or logits.shape[1]
+            self.confusion = torch.zeros(self.num_classes * self.num_classes, dtype=torch.long, device=logits.device)
+            self.histograms = torch.zeros(2 * self.n_bins, dtype=torch.long, device=logits.device)
+
+        predicted = logits.argmax(dim=1)
+        self.confusion += torch.bincount(targets * self.num_classes + predicted,
+                                         minlength=self.num_classes * self.num_classes)
+
+        probs = torch.softmax(logits, dim=1)[:, self.positive_class]
+        bins = (probs * self.n_bins).long().clamp_(max=self.n_bins - 1)
+        is_positive = (targets == self.positive_class).long()
+        self.histograms += torch.bincount(is_positive * self.n_bins + bins, minlength=2 * self.n_bins)
+
+    def compute(self):
+        if self.confusion is None:
+            raise ValueError("no predictions to compute metrics on")
+        confusion = self.confusion.reshape(self.num_classes, self.num_classes).double()
+        negatives, positives = self.histograms.reshape(2, self.n_bins).double()
+
+        true_pos = confusion.diagonal()
+        precision = true_pos / confusion.sum(dim=0).clamp(min=1)
+        recall = true_pos / confusion.sum(dim=1).clamp(min=1)
+        f1 = torch.where(precision + recall > 0, 2 * precision * recall / (precision + recall),
+                         torch.zeros_like(precision))
+        f1 = f1[self.positive_class] if self.num_classes == 2 else f1.mean()
+
+        # P(score_pos > score_neg) + 0.5 P(tie), with ties taken per bin
+        negatives_below = torch.cumsum(negatives, 0) - negatives
+        n_pos, n_neg = positives.sum(), negatives.sum()
+        auc = ((positives * (negatives_below + 0.5 * negatives)).sum() / (n_pos * n_neg)
+               if n_pos > 0 and n_neg > 0 else torch.tensor(float('nan'), dtype=torch.float64))
+
+        accuracy, f1, auc = torch.stack([true_pos.sum() / confusion.sum(), f1, auc.to(f1.device)]).tolist()
+        return {'accuracy': accuracy, 'f1': f1, 'auc': auc}
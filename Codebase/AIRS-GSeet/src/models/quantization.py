@@ -0,0 +1,172 @@
+"""
+Post-training quantization of the SHI/ARS seed health models for CPU deployment.
+
+Linear layers (UAV/env/field/storage encoders and the fusion MLPs) are
+quantized dynamically to int8; the Conv1d/ReLU stack of the hyperspectral
+encoder is quantized statically to int8 with activation ranges calibrated on
+spectra from ``DataGenerator.generate_hyperspectral_seed``. A bfloat16
+autocast wrapper is the non-integer alternative. ``quantization_report``
+compares every mode with the float model in R² and latency.
+"""
+
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+from torch.ao.quantization import DeQuantStub, QuantStub, convert, fuse_modules, get_default_qconfig, prepare, \
+    quantize_dynamic
+
+from src.models.metrics import RegressionMetrics
+from src.models.seed_health_model import SeedHealthModel, AflatoxinRiskModel
+
+
+QUANTIZATION_MODES = ('float32', 'dynamic_int8', 'static_int8', 'int8', 'bf16')
+
+
+class _StaticInt8Stack(nn.Module):
+    """Quantize -> fused int8 Conv1d/ReLU stack -> dequantize."""
+
+    def __init__(self, layers):
+        super(_StaticInt8Stack, self).__init__()
+        self.quant = QuantStub()
+        self.layers = layers
+        self.dequant = DeQuantStub()
+
+    def forward(self, x):
+        return self.dequant(self.layers(self.quant(x)))
+
+
+class Bf16SeedModel(nn.Module):
+    """Run a seed model under CPU bfloat16 autocast and return float32 scores."""
+
+    def __init__(self, model):
+        super(Bf16SeedModel, self).__init__()
+        self.model = model
+
+    def forward(self, *inputs):
+        with torch.autocast('cpu', dtype=torch.bfloat16):
+            return self.model(*inputs).float()
+
+
+def calibration_spectra(generator, n_samples=256, n_wavelengths=2151, spectral_preprocessor=None):
+    """Draw float32 calibration spectra from ``generator.generate_hyperspectral_seed``.
+
+    Pass the fitted SpectralPreprocessor when the models consume reduced spectra.
+    """
+    spectra, _, _ = generator.generate_hyperspectral_seed(n_samples=n_samples, n_wavelengths=n_wavelengths,
+                                                          dtype=np.float32)
+    if spectral_preprocessor is not None:
+        spectra = spectral_preprocessor.transform(spectra)
+    return torch.from_numpy(np.ascontiguousarray(spectra, dtype=np.float32))
+
+
+def quantize_seed_model(model, calibration=None, linear=True, conv=True, batch_size=64):
+    """Return an int8 copy of a SeedHealthModel or AflatoxinRiskModel.
+
+    ``linear`` quantizes every nn.Linear dynamically; ``conv`` quantizes the
+    hyperspectral Conv1d/ReLU stack statically, calibrating its observers on
+    ``calibration`` spectra [N, hyperspectral_dim]. The input model is untouched.
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    if linear:
+        model = quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    if conv:
+        if calibration is None:
+            raise ValueError("static conv quantization needs calibration spectra")
+        encoder_name = _spectral_encoder_name(model)
+        encoder = getattr(model, encoder_name)
+        depth = _conv_stack_depth(encoder)
+
+        layers = encoder[:depth]
+        fuse_modules(layers, [[str(i), str(i + 1)] for i in range(0, depth, 2)], inplace=True)
+        stack = _StaticInt8Stack(layers)
+        stack.qconfig = get_default_qconfig(torch.backends.quantized.engine)
+        prepare(stack, inplace=True)
+        with torch.no_grad():
+            for start in range(0, len(calibration), batch_size):
+                stack(calibration[start:start + batch_size].unsqueeze(1))
+        convert(stack, inplace=True)
+        setattr(model, encoder_name, nn.Sequential(stack, *encoder[depth:]))
+    return model
+
+
+def build_quantized_model(model, mode, calibration=None):
+    """``model`` converted to one of QUANTIZATION_MODES."""
+    if mode == 'float32':
+        return model.eval()
+    if mode == 'dynamic_int8':
+        return quantize_seed_model(model, linear=True, conv=False)
+    if mode == 'static_int8':
+        return quantize_seed_model(model, calibration, linear=False, conv=True)
+    if mode == 'int8':
+        return quantize_seed_model(model, calibration, linear=True, conv=True)
+    if mode == 'bf16':
+        return Bf16SeedModel(model.eval())
+    raise ValueError(f"unknown quantization mode {mode!r}, expected one of {QUANTIZATION_MODES}")
+
+
+def quantization_report(shi_model, ars_model, data, calibration, modes=QUANTIZATION_MODES, batch_size=256):
+    """R² and CPU latency of every mode against the float32 models.
+
+    ``data`` is a dict of tensors with the keys used by train_seed_models
+    (hyperspectral, uav, env, field, storage, shi, ars).
+    """
+    shi_model = copy.deepcopy(shi_model).cpu().eval()
+    ars_model = copy.deepcopy(ars_model).cpu().eval()
+    tasks = [
+        ('SHI', shi_model, ('hyperspectral', 'uav', 'env'), 'shi'),
+        ('ARS', ars_model, ('hyperspectral', 'field', 'storage'), 'ars'),
+    ]
+
+    rows = []
+    for task, model, input_keys, target_key in tasks:
+        inputs = [data[k].float() for k in input_keys]
+        targets = data[target_key]
+        baseline = None
+        for mode in modes:
+            runtime = build_quantized_model(model, mode, calibration)
+            preds, seconds = _timed_predict(runtime, inputs, batch_size)
+            metrics = RegressionMetrics()
+            metrics.update(preds, targets)
+            r2 = metrics.compute()['r2']
+            if baseline is None:
+                baseline = (r2, seconds)
+            rows.append({
+                'Model': task,
+                'Mode': mode,
+                'R2': r2,
+                'R2_Delta': r2 - baseline[0],
+                'ms_per_sample': 1000 * seconds / len(targets),
+                'Speedup': baseline[1] / seconds,
+            })
+    return pd.DataFrame(rows)
+
+
+def _timed_predict(model, inputs, batch_size):
+    preds = []
+    with torch.inference_mode():
+        model(*(x[:batch_size] for x in inputs))  # warm-up
+        start = time.perf_counter()
+        for i in range(0, len(inputs[0]), batch_size):
+            preds.append(model(*(x[i:i + batch_size] for x in inputs)))
+        seconds = time.perf_counter() - start
+    return torch.cat(preds).float(), seconds
+
+
+def _spectral_encoder_name(model):
+    if isinstance(model, SeedHealthModel):
+        return 'hyperspectral_encoder'
+    if isinstance(model, AflatoxinRiskModel):
+        return 'hyperspectral_branch'
+    raise TypeError(f"expected SeedHealthModel or AflatoxinRiskModel, got {type(model).__name__}")
+
+
+def _conv_stack_depth(encoder):
+    """Number of leading Conv1d/ReLU layers of a spectral encoder."""
+    depth = 0
+    while isinstance(encoder[depth], (nn.Conv1d, nn.ReLU)):
+        depth += 1
+    return depth
@@ -6,12 +6,52 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+from src.models.checkpoint import CheckpointManager
+from src.models.metrics import RegressionMetrics
+from src.models.trainer import Trainer
+
+
+class ModalityAttention(nn.Module):
+    """Multi-head self-attention over a short sequence of modality tokens.
+
+    Uses F.scaled_dot_product_attention (fused kernels) with a residual
+    connection and layer norm.
+    """
+
+    def __init__(self, embed_dim, num_heads=8, dropout=0.1):
+        super(ModalityAttention, self).__init__()
+        if embed_dim % num_heads:
+            raise ValueError("embed_dim must be divisible by num_heads")
+        self.num_heads = num_heads
+        self.dropout = dropout
+        self.qkv = nn.Linear(embed_dim, 3 * embed_dim)
+        self.out_proj = nn.Linear(embed_dim, embed_dim)
+        self.norm = nn.LayerNorm(embed_dim)
+
+    def forward(self, tokens):
+        B, T, D = tokens.shape
+        qkv = self.qkv(tokens).reshape(B, T, 3, self.num_heads, D // self.num_heads).permute(2, 0, 3, 1, 4)
+        attended = F.scaled_dot_product_attention(qkv[0], qkv[1], qkv[2],
+                                                  dropout_p=self.dropout if self.training else 0.0)
+        attended = attended.transpose(1, 2).reshape(B, T, D)
+        return self.norm(tokens + self.out_proj(attended))
+
 
 class SeedHealthModel(nn.Module):
-    """Multi-modal model for Seed Health Index prediction."""
+    """Multi-modal model for Seed Health Index prediction.
+
+    ``fusion='concat'`` feeds the concatenated modality features to the fusion
+    MLP; ``fusion='attention'`` projects the spectral, UAV and environment
+    features to one token each and mixes them with ModalityAttention first.
+    """
     
-    def __init__(self, hyperspectral_dim=2151, uav_feat_dim=128, env_feat_dim=10, hidden_dim=256):
+    def __init__(self, hyperspectral_dim=2151, uav_feat_dim=128, env_feat_dim=10, hidden_dim=256, fusion='concat',
+                 num_heads=8):
         super(SeedHealthModel, self).__init__()
+        if fusion not in ('concat', 'attention'):
+            raise ValueError(f"fusion must be 'concat' or 'attention', got {fusion!r}")
+        self.fusion_mode = fusion
+        self.hyperspectral_dim = hyperspectral_dim
         
         # Hyperspectral encoder (1D CNN)
         self.hyperspectral_encoder = nn.Sequential(
@@ -41,16 +81,24 @@ class SeedHealthModel(nn.Module):
             nn.Linear(64, 32)
         )
         
-        # Attention-based fusion
-        self.attention = nn.MultiheadAttention(
-            embed_dim=hidden_dim,
-            num_heads=8,
-            batch_first=True
-        )
+        if fusion == 'attention':
+            # One hidden_dim token per modality, mixed by self-attention
+            self.modality_proj = nn.ModuleList([
+                nn.Linear(256, hidden_dim),
+                nn.Linear(64, hidden_dim),
+                nn.Linear(32, hidden_dim)
+            ])
+            self.modality_attention = ModalityAttention(hidden_dim, num_heads)
+            fusion_dim = 3 * hidden_dim
+        else:
+            fusion_dim = 256 + 64 + 32
+            # Checkpoints from before concat/attention fusion carry an unused
+            # nn.MultiheadAttention; drop its weights instead of failing
+            self.register_load_state_dict_pre_hook(_drop_legacy_attention)
         
         # Fusion layers
         self.fusion = nn.Sequential(
-            nn.Linear(256 + 64 + 32, hidden_dim),
+            nn.Linear(fusion_dim, hidden_dim),
             nn.ReLU(),
             nn.Dropout(0.3),
             nn.Linear(hidden_dim, hidden_dim // 2),
@@ -60,13 +108,25 @@ class SeedHealthModel(nn.Module):
         )
         
     def forward(self, hyperspectral, uav_features, env_features):
-        # Encode each modality
         h_feat = self.hyperspectral_encoder(hyperspectral.unsqueeze(1))  # [B, 256]
+        return self.fuse(h_feat, uav_features, env_features)
+
+    def fuse(self, h_feat, uav_features, env_features):
+        """Predict SHI from encoded hyperspectral features and raw UAV/env features."""
+        # Encode remaining modalities
         u_feat = self.uav_encoder(uav_features)  # [B, 64]
         e_feat = self.env_encoder(env_features)  # [B, 32]
-        
-        # Concatenate features
-        combined = torch.cat([h_feat, u_feat, e_feat], dim=1)  # [B, 352]
+        return self.fusion_head(h_feat, u_feat, e_feat)
+
+    def fusion_head(self, h_feat, u_feat, e_feat):
+        """Predict SHI from the hyperspectral, UAV and environment embeddings."""
+        if self.fusion_mode == 'attention':
+            tokens = torch.stack([proj(feat) for proj, feat in zip(self.modality_proj, (h_feat, u_feat, e_feat))],
+                                 dim=1)  # [B, 3, hidden_dim]
+            combined = self.modality_attention(tokens).flatten(1)  # [B, 3 * hidden_dim]
+        else:
+            # Concatenate features
+            combined = torch.cat([h_feat, u_feat, e_feat], dim=1)  # [B, 352]
         
         # Fusion and prediction
         shi = self.fusion(combined)  # [B, 1]
@@ -75,11 +135,18 @@ class SeedHealthModel(nn.Module):
         return shi.squeeze(1)
 
 
+def _drop_legacy_attention(module, state_dict, prefix, local_metadata, strict, missing_keys, unexpected_keys,
+                           error_msgs):
+    for key in [k for k in state_dict if k.startswith(prefix + 'attention.')]:
+        del state_dict[key]
+
+
 class AflatoxinRiskModel(nn.Module):
     """Aflatoxin Risk Score (ARS) prediction model."""
     
     def __init__(self, hyperspectral_dim=2151, field_feat_dim=50, storage_feat_dim=4, hidden_dim=256):
         super(AflatoxinRiskModel, self).__init__()
+        self.hyperspectral_dim = hyperspectral_dim
         
         # Hyperspectral branch
         self.hyperspectral_branch = nn.Sequential(
@@ -120,11 +187,18 @@ class AflatoxinRiskModel(nn.Module):
         )
         
     def forward(self, hyperspectral, field_features, storage_features):
-        # Encode each branch
         h_feat = self.hyperspectral_branch(hyperspectral.unsqueeze(1))  # [B, 64]
+        return self.fuse(h_feat, field_features, storage_features)
+
+    def fuse(self, h_feat, field_features, storage_features):
+        """Predict ARS from encoded hyperspectral features and raw field/storage features."""
+        # Encode remaining branches
         f_feat = self.field_branch(field_features)  # [B, 64]
         s_feat = self.storage_branch(storage_features)  # [B, 32]
-        
+        return self.fusion_head(h_feat, f_feat, s_feat)
+
+    def fusion_head(self, h_feat, f_feat, s_feat):
+        """Predict ARS from the hyperspectral, field and storage embeddings."""
         # Concatenate and fuse
         combined = torch.cat([h_feat, f_feat, s_feat], dim=1)  # [B, 160]
         ars = self.fusion(combined)  # [B, 1]
@@ -133,68 +207,118 @@ class AflatoxinRiskModel(nn.Module):
         return ars.squeeze(1)
 
 
-def train_seed_models(shi_model, ars_model, train_loader, val_loader, epochs=100, device='cpu'):
-    """Train SHI and ARS models."""
+class JointSeedModel(nn.Module):
+    """SHI and ARS models sharing one hyperspectral trunk for multi-task training.
+
+    The first two conv layers of both spectral encoders are identical, so the
+    ARS branch is tied to the SHI encoder's layers and the trunk runs once per
+    batch. Tying is done in place: the wrapped models keep their usual
+    forward() and state_dict() layout and remain usable on their own.
+    """
+
+    TRUNK_DEPTH = 4  # Conv1d, ReLU, Conv1d, ReLU
+
+    def __init__(self, shi_model, ars_model):
+        super(JointSeedModel, self).__init__()
+        self.shi_model = shi_model
+        self.ars_model = ars_model
+        for i in range(self.TRUNK_DEPTH):
+            ars_model.hyperspectral_branch[i] = shi_model.hyperspectral_encoder[i]
+        self.spectral_trunk = shi_model.hyperspectral_encoder[:self.TRUNK_DEPTH]
+        self.shi_spectral_head = shi_model.hyperspectral_encoder[self.TRUNK_DEPTH:]
+        self.ars_spectral_head = ars_model.hyperspectral_branch[self.TRUNK_DEPTH:]
+
+    def forward(self, hyperspectral, uav_features, env_features, field_features, storage_features):
+        trunk = self.spectral_trunk(hyperspectral.unsqueeze(1))  # [B, 128, L/4]
+        shi = self.shi_model.fuse(self.shi_spectral_head(trunk), uav_features, env_features)
+        ars = self.ars_model.fuse(self.ars_spectral_head(trunk), field_features, storage_features)
+        return shi, ars
+
+
+def train_seed_models(shi_model, ars_model, train_loader, val_loader, epochs=100, device='cpu', joint=False,
+                      precision='fp32', accumulation_steps=1, checkpoint_dir='checkpoints', keep_best=3, resume=False,
+                      lr=1e-3, weight_decay=1e-5):
+    """Train SHI and ARS models.
+
+    With ``joint=True`` both models share one hyperspectral trunk (see
+    JointSeedModel) and are trained with a single optimizer on the summed loss.
+    ``precision`` and ``accumulation_steps`` are passed to the shared Trainer;
+    ``lr`` and ``weight_decay`` configure Adam.
+    The ``keep_best`` best epochs of each model by validation R² (tags ``shi``
+    and ``ars``) and the last training state (tag ``seed``) are checkpointed
+    to ``checkpoint_dir`` in the background; ``resume=True`` continues from
+    the last state found there.
+    """
     shi_criterion = nn.MSELoss()
     ars_criterion = nn.MSELoss()
     
-    shi_optimizer = torch.optim.Adam(shi_model.parameters(), lr=1e-3, weight_decay=1e-5)
-    ars_optimizer = torch.optim.Adam(ars_model.parameters(), lr=1e-3, weight_decay=1e-5)
+    if joint:
+        joint_model = JointSeedModel(shi_model, ars_model)
+        joint_optimizer = torch.optim.Adam(joint_model.parameters(), lr=lr, weight_decay=weight_decay)
+        joint_scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(joint_optimizer, mode='min', factor=0.5, patience=10)
+        optimizers = [joint_optimizer]
+        schedulers = [joint_scheduler]
+    else:
+        shi_optimizer = torch.optim.Adam(shi_model.parameters(), lr=lr, weight_decay=weight_decay)
+        ars_optimizer = torch.optim.Adam(ars_model.parameters(), lr=lr, weight_decay=weight_decay)
+        
+        shi_scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(shi_optimizer, mode='min', factor=0.5, patience=10)
+        ars_scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(ars_optimizer, mode='min', factor=0.5, patience=10)
+        optimizers = [shi_optimizer, ars_optimizer]
+        schedulers = [shi_scheduler, ars_scheduler]
+    
+    def step(batch):
+        if joint:
+            # Shared trunk forward, both heads, one backward pass
+            shi_pred, ars_pred = joint_model(batch['hyperspectral'], batch['uav'], batch['env'],
+                                             batch['field'], batch['storage'])
+        else:
+            # The models share no parameters, so backpropagating the summed
+            # loss gives each optimizer exactly its own model's gradients
+            shi_pred = shi_model(batch['hyperspectral'], batch['uav'], batch['env'])
+            ars_pred = ars_model(batch['hyperspectral'], batch['field'], batch['storage'])
+        return {'shi': shi_criterion(shi_pred.float(), batch['shi']),
+                'ars': ars_criterion(ars_pred.float(), batch['ars'])}
     
-    shi_scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(shi_optimizer, mode='min', factor=0.5, patience=10)
-    ars_scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(ars_optimizer, mode='min', factor=0.5, patience=10)
+    trainer = Trainer(step, optimizers, device, precision, accumulation_steps)
     
     best_shi_r2 = 0.0
     best_ars_r2 = 0.0
     
-    for epoch in range(epochs):
+    checkpoints = CheckpointManager(checkpoint_dir, keep_best=keep_best, mode='max')
+    start_epoch = 0
+    if not resume:
+        checkpoints.reset('shi', 'ars', 'seed')  # don't mix in best-k checkpoints of an earlier run
+    state = checkpoints.load_last('seed') if resume else None
+    if state is not None:
+        shi_model.load_state_dict(state['shi_model'])
+        ars_model.load_state_dict(state['ars_model'])
+        for optimizer, optimizer_state in zip(optimizers, state['optimizers']):
+            optimizer.load_state_dict(optimizer_state)
+        for scheduler, scheduler_state in zip(schedulers, state['schedulers']):
+            scheduler.load_state_dict(scheduler_state)
+        best_shi_r2 = state['best_shi_r2']
+        best_ars_r2 = state['best_ars_r2']
+        start_epoch = state['epoch'] + 1
+        torch.set_rng_state(state['rng_state'])
+    
+    for epoch in range(start_epoch, epochs):
         # Training
         shi_model.train()
         ars_model.train()
         
-        shi_train_loss = 0.0
-        ars_train_loss = 0.0
-        
-        for batch in train_loader:
-            # SHI training
-            h_spec, uav_feat, env_feat, shi_target = batch['hyperspectral'], batch['uav'], batch['env'], batch['shi']
-            h_spec = h_spec.to(device)
-            uav_feat = uav_feat.to(device)
-            env_feat = env_feat.to(device)
-            shi_target = shi_target.to(device)
-            
-            shi_optimizer.zero_grad()
-            shi_pred = shi_model(h_spec, uav_feat, env_feat)
-            shi_loss = shi_criterion(shi_pred, shi_target)
-            shi_loss.backward()
-            shi_optimizer.step()
-            shi_train_loss += shi_loss.item()
-            
-            # ARS training
-            field_feat = batch['field'].to(device)
-            storage_feat = batch['storage'].to(device)
-            ars_target = batch['ars'].to(device)
-            
-            ars_optimizer.zero_grad()
-            ars_pred = ars_model(h_spec, field_feat, storage_feat)
-            ars_loss = ars_criterion(ars_pred, ars_target)
-            ars_loss.backward()
-            ars_optimizer.step()
-            ars_train_loss += ars_loss.item()
-        
-        shi_train_loss /= len(train_loader)
-        ars_train_loss /= len(train_loader)
+        train_losses = trainer.train_epoch(train_loader)
+        shi_train_loss = train_losses['shi']
+        ars_train_loss = train_losses['ars']
         
         # Validation
         shi_model.eval()
         ars_model.eval()
         
-        shi_val_preds = []
-        shi_val_targets = []
-        ars_val_preds = []
-        ars_val_targets = []
+        shi_val_metrics = RegressionMetrics()
+        ars_val_metrics = RegressionMetrics()
         
-        with torch.no_grad():
+        with torch.no_grad(), trainer.autocast():
             for batch in val_loader:
                 h_spec = batch['hyperspectral'].to(device)
                 uav_feat = batch['uav'].to(device)
@@ -202,39 +326,44 @@ def train_seed_models(shi_model, ars_model, train_loader, val_loader, epochs=100
                 field_feat = batch['field'].to(device)
                 storage_feat = batch['storage'].to(device)
                 
-                shi_pred = shi_model(h_spec, uav_feat, env_feat)
-                ars_pred = ars_model(h_spec, field_feat, storage_feat)
+                if joint:
+                    shi_pred, ars_pred = joint_model(h_spec, uav_feat, env_feat, field_feat, storage_feat)
+                else:
+                    shi_pred = shi_model(h_spec, uav_feat, env_feat)
+                    ars_pred = ars_model(h_spec, field_feat, storage_feat)
                 
-                shi_val_preds.append(shi_pred.cpu())
-                shi_val_targets.append(batch['shi'])
-                ars_val_preds.append(ars_pred.cpu())
-                ars_val_targets.append(batch['ars'])
+                shi_val_metrics.update(shi_pred, batch['shi'])
+                ars_val_metrics.update(ars_pred, batch['ars'])
         
         # Calculate R²
-        from sklearn.metrics import r2_score
-        
-        shi_pred_all = torch.cat(shi_val_preds).numpy()
-        shi_target_all = torch.cat(shi_val_targets).numpy()
-        shi_r2 = r2_score(shi_target_all, shi_pred_all)
-        
-        ars_pred_all = torch.cat(ars_val_preds).numpy()
-        ars_target_all = torch.cat(ars_val_targets).numpy()
-        ars_r2 = r2_score(ars_target_all, ars_pred_all)
-        
-        shi_scheduler.step(shi_train_loss)
-        ars_scheduler.step(ars_train_loss)
+        shi_r2 = shi_val_metrics.compute()['r2']
+        ars_r2 = ars_val_metrics.compute()['r2']
         
-        if shi_r2 > best_shi_r2:
-            best_shi_r2 = shi_r2
-            torch.save(shi_model.state_dict(), 'best_shi_model.pth')
+        if joint:
+            joint_scheduler.step(shi_train_loss + ars_train_loss)
+        else:
+            shi_scheduler.step(shi_train_loss)
+            ars_scheduler.step(ars_train_loss)
         
-        if ars_r2 > best_ars_r2:
-            best_ars_r2 = ars_r2
-            torch.save(ars_model.state_dict(), 'best_ars_model.pth')
+        best_shi_r2 = max(best_shi_r2, shi_r2)
+        best_ars_r2 = max(best_ars_r2, ars_r2)
+        checkpoints.save_best('shi', epoch, shi_r2, {'model': shi_model.state_dict()})
+        checkpoints.save_best('ars', epoch, ars_r2, {'model': ars_model.state_dict()})
+        checkpoints.save_last('seed', epoch, {
+            'epoch': epoch,
+            'shi_model': shi_model.state_dict(),
+            'ars_model': ars_model.state_dict(),
+            'optimizers': [optimizer.state_dict() for optimizer in optimizers],
+            'schedulers': [scheduler.state_dict() for scheduler in schedulers],
+            'best_shi_r2': best_shi_r2,
+            'best_ars_r2': best_ars_r2,
+            'rng_state': torch.get_rng_state()
+        })
         
         if (epoch + 1) % 20 == 0:
             print(f'Epoch {epoch+1}/{epochs}')
             print(f'  SHI - Train Loss: {shi_train_loss:.4f}, Val R²: {shi_r2:.4f}')
             print(f'  ARS - Train Loss: {ars_train_loss:.4f}, Val R²: {ars_r2:.4f}')
     
+    checkpoints.close()
     return best_shi_r2, best_ars_r2
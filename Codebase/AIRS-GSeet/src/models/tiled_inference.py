@@ -0,0 +1,147 @@
+"""
+Tiled sliding-window inference of the canopy stress model over UAV orthomosaics.
+
+The mosaic is read window by window (a numpy array or memmap in H x W x C
+layout, or a GeoTIFF through rasterio), classified in batches of overlapping
+tiles, and the per-tile logits are blended into a coarse stress map, so the
+full-resolution raster never has to be loaded into memory.
+"""
+
+import numpy as np
+import torch
+
+
+class TiledCanopyInference:
+    """Stress map of a large RGB raster from a tile classifier such as CNNViTHybrid.
+
+    The map has one cell per ``cell_size`` x ``cell_size`` pixels. Every tile adds
+    its logits to the cells it covers, weighted by a ``'gaussian'`` window
+    (centre-weighted, hides tile seams) or ``'uniform'`` one, and each cell ends
+    up with the weighted mean over the tiles overlapping it.
+    """
+
+    def __init__(self, model, tile_size=256, overlap=64, batch_size=16, blend='gaussian', cell_size=16,
+                 device='cpu'):
+        if tile_size % cell_size or (tile_size - overlap) % cell_size:
+            raise ValueError("tile_size and tile_size - overlap must be multiples of cell_size")
+        if not 0 <= overlap < tile_size:
+            raise ValueError("overlap must be in [0, tile_size)")
+        if blend not in ('gaussian', 'uniform'):
+            raise ValueError(f"blend must be 'gaussian' or 'uniform', got {blend!r}")
+
+        self.model = model.to(device).eval()
+        self.tile_size = tile_size
+        self.stride = tile_size - overlap
+        self.batch_size = batch_size
+        self.cell_size = cell_size
+        self.device = device
+
+        tile_cells = tile_size // cell_size
+        if blend == 'gaussian':
+            centre = (tile_cells - 1) / 2
+            profile = np.exp(-0.5 * ((np.arange(tile_cells) - centre) / (tile_cells / 4)) ** 2)
+        else:
+            profile = np.ones(tile_cells)
+        self.weights = np.outer(profile, profile).astype(np.float32)
+
+    def predict(self, raster, out=None):
+        """Blend tile logits over ``raster`` into a [num_classes, H_cells, W_cells] map.
+
+        ``raster`` is an H x W x C array/memmap (uint8 scaled to [0, 1]) or a path
+        to a GeoTIFF whose first three bands are RGB. ``out`` may be a
+        caller-supplied (e.g. memmapped) float32 array for the map.
+        """
+        if isinstance(raster, str):
+            import rasterio
+
+            with rasterio.open(raster) as dataset:
+                return self._predict(_GeoTiffReader(dataset), out)
+        return self._predict(_ArrayReader(raster), out)
+
+    def stress_probability(self, raster, stress_class=1, out=None):
+        """Per-cell probability of ``stress_class`` over ``raster``."""
+        logits = self.predict(raster, out)
+        return torch.softmax(torch.from_numpy(np.asarray(logits)), dim=0)[stress_class].numpy()
+
+    def _predict(self, reader, out):
+        height, width = reader.shape
+        map_h = -(-height // self.cell_size)
+        map_w = -(-width // self.cell_size)
+        # Tiles are laid out over the raster padded to whole cells, so every tile
+        # starts on the cell grid and the last cell row/column is covered; reads
+        # past the raster edge are zero-filled
+        positions = [(y, x) for y in _tile_starts(map_h * self.cell_size, self.tile_size, self.stride)
+                     for x in _tile_starts(map_w * self.cell_size, self.tile_size, self.stride)]
+
+        logit_sum = None
+        weight_sum = np.zeros((map_h, map_w), dtype=np.float32)
+        batch = np.zeros((self.batch_size, 3, self.tile_size, self.tile_size), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, len(positions), self.batch_size):
+                batch_positions = positions[start:start + self.batch_size]
+                for i, (y, x) in enumerate(batch_positions):
+                    batch[i] = 0
+                    tile = reader.read(y, x, self.tile_size)
+                    batch[i, :, :tile.shape[1], :tile.shape[2]] = tile
+                logits = self.model(torch.from_numpy(batch[:len(batch_positions)]).to(self.device))
+                logits = logits.float().cpu().numpy()
+
+                if logit_sum is None:
+                    shape = (logits.shape[1], map_h, map_w)
+                    if out is None:
+                        logit_sum = np.zeros(shape, dtype=np.float32)
+                    elif out.shape != shape:
+                        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+                    else:
+                        logit_sum = out
+                        logit_sum[...] = 0
+
+                for (y, x), tile_logits in zip(batch_positions, logits):
+                    cy, cx = y // self.cell_size, x // self.cell_size
+                    weights = self.weights[:map_h - cy, :map_w - cx]
+                    h, w = weights.shape
+                    logit_sum[:, cy:cy + h, cx:cx + w] += tile_logits[:, None, None] * weights
+                    weight_sum[cy:cy + h, cx:cx + w] += weights
+
+        logit_sum /= np.maximum(weight_sum, 1e-12)
+        return logit_sum
+
+
+def _tile_starts(length, tile_size, stride):
+    """Tile offsets along one axis; the last tile is aligned to the end of the axis."""
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size + 1, stride))
+    if starts[-1] != length - tile_size:
+        starts.append(length - tile_size)
+    return starts
+
+
+class _ArrayReader:
+    """Windowed reads from an H x W x C numpy array or memmap."""
+
+    def __init__(self, array):
+        self.array = array
+        self.shape = array.shape[:2]
+        self.scale = 1 / 255 if array.dtype == np.uint8 else 1.0
+
+    def read(self, y, x, size):
+        tile = np.asarray(self.array[y:y + size, x:x + size, :3], dtype=np.float32)
+        return tile.transpose(2, 0, 1) * self.scale
+
+
+class _GeoTiffReader:
+    """Windowed reads of the first three bands of an open rasterio dataset."""
+
+    def __init__(self, dataset):
+        from rasterio.windows import Window
+
+        self.dataset = dataset
+        self.window = Window
+        self.shape = (dataset.height, dataset.width)
+        self.scale = 1 / 255 if dataset.dtypes[0] == 'uint8' else 1.0
+
+    def read(self, y, x, size):
+        window = self.window(x, y, min(size, self.shape[1] - x), min(size, self.shape[0] - y))
+        return self.dataset.read(indexes=[1, 2, 3], window=window).astype(np.float32) * self.scale
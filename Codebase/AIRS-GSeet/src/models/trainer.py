@@ -0,0 +1,98 @@
+"""
+Shared training loop for the AIRS-GSeed models.
+
+Runs the per-batch forward under optional bfloat16 autocast (CPU or CUDA),
+accumulates gradients over several micro-batches, and keeps the running
+losses on the device so the host only syncs once per epoch.
+"""
+
+import torch
+
+
+PRECISIONS = ('fp32', 'bf16')
+
+
+def configure_threads(intra_op_threads=None, inter_op_threads=None):
+    """Set PyTorch's intra-op and inter-op CPU thread pools (None leaves them as they are).
+
+    The inter-op pool can only be sized before the first parallel operation,
+    so a late call leaves it unchanged.
+    """
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            pass
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+class Trainer:
+    """Mixed-precision training epochs with gradient accumulation.
+
+    ``step_fn(batch)`` gets a batch already moved to ``device`` and returns a
+    dict of named scalar losses; their sum is backpropagated and every
+    optimizer in ``optimizers`` steps once per ``accumulation_steps`` batches.
+    """
+
+    def __init__(self, step_fn, optimizers, device='cpu', precision='fp32', accumulation_steps=1):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+        if accumulation_steps < 1:
+            raise ValueError("accumulation_steps must be >= 1")
+        self.step_fn = step_fn
+        self.optimizers = list(optimizers)
+        self.device = torch.device(device)
+        self.precision = precision
+        self.accumulation_steps = accumulation_steps
+
+    def autocast(self):
+        """Autocast context for forward passes at the configured precision."""
+        return torch.autocast(self.device.type, dtype=torch.bfloat16, enabled=self.precision == 'bf16')
+
+    def to_device(self, batch):
+        """Move a tensor, or a dict/tuple/list of tensors, to the training device."""
+        non_blocking = self.device.type == 'cuda'
+        if isinstance(batch, dict):
+            return {k: v.to(self.device, non_blocking=non_blocking) for k, v in batch.items()}
+        if isinstance(batch, (tuple, list)):
+            return type(batch)(t.to(self.device, non_blocking=non_blocking) for t in batch)
+        return batch.to(self.device, non_blocking=non_blocking)
+
+    def train_epoch(self, loader):
+        """One pass over ``loader``; returns the mean of each named loss."""
+        sums = None
+        n_batches = 0
+        pending = 0
+        self._zero_grad()
+        for batch in loader:
+            with self.autocast():
+                losses = self.step_fn(self.to_device(batch))
+            (sum(losses.values()) / self.accumulation_steps).backward()
+            pending += 1
+            if pending == self.accumulation_steps:
+                self._step()
+                pending = 0
+
+            if sums is None:
+                sums = {k: torch.zeros((), device=self.device) for k in losses}
+            for k, loss in losses.items():
+                sums[k] += loss.detach().float()
+            n_batches += 1
+
+        # Last partial accumulation window
+        if pending:
+            self._step()
+        if not n_batches:
+            return {}
+        return {k: v / n_batches for k, v in zip(sums, torch.stack(list(sums.values())).tolist())}
+
+    def _step(self):
+        for optimizer in self.optimizers:
+            optimizer.step()
+        self._zero_grad()
+
+    def _zero_grad(self):
+        for optimizer in self.optimizers:
+            optimizer.zero_grad(set_to_none=True)
@@ -0,0 +1,232 @@
+"""
+Local SHI/ARS scoring service with dynamic micro-batching.
+
+Single-seed requests are queued and coalesced into batches of up to
+``max_batch_size`` or whatever arrived within ``max_latency_ms`` of the first
+request, then scored in one forward pass under ``torch.inference_mode`` on a
+worker thread while the event loop keeps collecting the next batch.
+
+Run as a JSON-lines TCP server:
+    python -m src.serving.seed_server --shi checkpoints/shi_best.pt --ars checkpoints/ars_best.pt \
+        --preprocessor checkpoints/spectral_prep.npz
+Each request line holds ``hyperspectral``, ``uav``, ``env``, ``field`` and
+``storage`` lists (plus an optional ``id`` echoed back); each response line
+holds ``shi`` and ``ars``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from src.models.checkpoint import load_model_weights
+from src.models.seed_health_model import SeedHealthModel, AflatoxinRiskModel, JointSeedModel
+
+INPUT_KEYS = ('hyperspectral', 'uav', 'env', 'field', 'storage')
+
+
+class SeedScoringService:
+    """Micro-batching wrapper around a SeedHealthModel / AflatoxinRiskModel pair.
+
+    ``spectral_preprocessor`` (a fitted SpectralPreprocessor) is applied to each
+    batch of raw spectra when the models were trained on reduced spectra.
+    ``score`` rejects a request whose inputs do not match the models' input
+    lengths before it is queued, so it cannot fail the rest of its batch.
+    """
+
+    def __init__(self, shi_model, ars_model, max_batch_size=64, max_latency_ms=5.0, device='cpu',
+                 spectral_preprocessor=None, max_inflight_batches=2):
+        self.shi_model = shi_model.to(device).eval()
+        self.ars_model = ars_model.to(device).eval()
+        # Score through the shared trunk when the models were trained jointly
+        tied = shi_model.hyperspectral_encoder[0] is ars_model.hyperspectral_branch[0]
+        self.joint_model = JointSeedModel(shi_model, ars_model).eval() if tied else None
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.device = device
+        self.spectral_preprocessor = spectral_preprocessor
+        self.input_dims = {
+            'hyperspectral': (spectral_preprocessor.n_wavelengths if spectral_preprocessor is not None
+                              else shi_model.hyperspectral_dim),
+            'uav': shi_model.uav_encoder[0].in_features,
+            'env': shi_model.env_encoder[0].in_features,
+            'field': ars_model.field_branch[0].in_features,
+            'storage': ars_model.storage_branch[0].in_features,
+        }
+        self.max_inflight_batches = max_inflight_batches
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._queue = None
+        self._batcher = None
+        self._batch_tasks = set()
+
+    async def start(self):
+        """Start the batching loop on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._inflight = asyncio.Semaphore(self.max_inflight_batches)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stop batching: batches already being scored finish, requests still queued are cancelled."""
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        while not self._queue.empty():
+            self._queue.get_nowait()[1].cancel()
+        # _run_batch resolves its futures and never raises
+        await asyncio.gather(*self._batch_tasks)
+        # Nothing is left on the executor, so don't block the event loop joining it
+        self._executor.shutdown(wait=False)
+
+    async def score(self, hyperspectral, uav, env, field, storage):
+        """Score one seed; returns ``{'shi': float, 'ars': float}``.
+
+        Raises ValueError if an input is not a flat vector of the expected length,
+        and RuntimeError if the service is not running.
+        """
+        if self._batcher is None:
+            raise RuntimeError("SeedScoringService is not running; await start() first")
+        inputs = [np.asarray(x, dtype=np.float32) for x in (hyperspectral, uav, env, field, storage)]
+        for key, x in zip(INPUT_KEYS, inputs):
+            if x.shape != (self.input_dims[key],):
+                raise ValueError(f"{key} must have {self.input_dims[key]} values, got shape {x.shape}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_latency
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._inflight.acquire()
+            except asyncio.CancelledError:
+                # Stopped while collecting: these requests were already taken off the queue
+                for _, future in batch:
+                    future.cancel()
+                raise
+            # The event loop only keeps weak references to tasks
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            stacked = [np.stack(column) for column in zip(*(inputs for inputs, _ in batch))]
+            shi, ars = await asyncio.get_running_loop().run_in_executor(self._executor, self._predict, stacked)
+            for (_, future), s, a in zip(batch, shi, ars):
+                if not future.done():
+                    future.set_result({'shi': float(s), 'ars': float(a)})
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            self._inflight.release()
+
+    def _predict(self, stacked):
+        hyperspectral, uav, env, field, storage = stacked
+        if self.spectral_preprocessor is not None:
+            hyperspectral = self.spectral_preprocessor.transform(hyperspectral)
+        with torch.inference_mode():
+            h, u, e, f, s = (torch.from_numpy(np.ascontiguousarray(x)).to(self.device)
+                             for x in (hyperspectral, uav, env, field, storage))
+            if self.joint_model is not None:
+                shi, ars = self.joint_model(h, u, e, f, s)
+            else:
+                shi = self.shi_model(h, u, e)
+                ars = self.ars_model(h, f, s)
+        return shi.float().cpu().numpy(), ars.float().cpu().numpy()
+
+
+async def serve(service, host='127.0.0.1', port=8765):
+    """Serve ``service`` over JSON-lines TCP until cancelled."""
+    await service.start()
+
+    async def handle(reader, writer):
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(line):
+            request = {}
+            try:
+                request = json.loads(line)
+                response = await service.score(*(request[k] for k in INPUT_KEYS))
+            except Exception as exc:
+                response = {'error': str(exc)}
+            if isinstance(request, dict) and 'id' in request:
+                response['id'] = request['id']
+            async with lock:
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+
+        while line := await reader.readline():
+            task = asyncio.create_task(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.gather(*pending)
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve SHI/ARS predictions over JSON-lines TCP.')
+    parser.add_argument('--shi', default='checkpoints/shi_best.pt', help='SeedHealthModel checkpoint or state dict')
+    parser.add_argument('--ars', default='checkpoints/ars_best.pt', help='AflatoxinRiskModel checkpoint or state dict')
+    parser.add_argument('--fusion', choices=('concat', 'attention'), default='concat',
+                        help='SeedHealthModel fusion mode the checkpoint was trained with')
+    parser.add_argument('--hidden-dim', type=int, default=256, help='hidden_dim the models were trained with')
+    parser.add_argument('--hyperspectral-dim', type=int, default=2151,
+                        help='spectrum length the models take when no preprocessor is used')
+    parser.add_argument('--preprocessor', default='checkpoints/spectral_prep.npz',
+                        help='fitted SpectralPreprocessor (.npz) applied to raw spectra, used if the file exists')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    preprocessor = None
+    hyperspectral_dim = args.hyperspectral_dim
+    if args.preprocessor and os.path.exists(args.preprocessor):
+        from src.data.spectral_preprocessing import SpectralPreprocessor
+        preprocessor = SpectralPreprocessor.load(args.preprocessor)
+        hyperspectral_dim = preprocessor.output_dim
+
+    shi_model = SeedHealthModel(hyperspectral_dim=hyperspectral_dim, hidden_dim=args.hidden_dim, fusion=args.fusion)
+    ars_model = AflatoxinRiskModel(hyperspectral_dim=hyperspectral_dim, hidden_dim=args.hidden_dim)
+    load_model_weights(shi_model, args.shi)
+    load_model_weights(ars_model, args.ars)
+
+    service = SeedScoringService(shi_model, ars_model, args.max_batch_size, args.max_latency_ms,
+                                 spectral_preprocessor=preprocessor)
+    print(f"Serving SHI/ARS on {args.host}:{args.port}")
+    asyncio.run(serve(service, args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import torch
+
+from src.models.canopy_stress_model import build_canopy_model
+
+
+def test_pos_embed_trains_after_eval_at_an_interpolated_size():
+    torch.manual_seed(0)
+    model = build_canopy_model('lite', pretrained=False, num_classes=2, img_size=128)
+    images = torch.rand(2, 3, 256, 256)
+
+    model.eval()
+    with torch.no_grad():
+        model(images)
+
+    model.train()
+    model(images).sum().backward()
+
+    assert model.pos_embed.grad is not None
+    assert model.pos_embed.grad.abs().sum() > 0
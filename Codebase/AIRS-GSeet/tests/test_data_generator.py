@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.data.data_generator import DataGenerator
+
+
+def test_hyperspectral_seed_is_the_same_data_for_every_dtype():
+    spectra64, wavelengths, labels64 = DataGenerator(seed=7).generate_hyperspectral_seed(n_samples=150)
+    spectra32, _, labels32 = DataGenerator(seed=7).generate_hyperspectral_seed(n_samples=150, dtype=np.float32)
+
+    assert spectra32.dtype == np.float32
+    np.testing.assert_array_equal(spectra32, spectra64.astype(np.float32))
+    for key in labels64:
+        np.testing.assert_array_equal(labels32[key], labels64[key])
+
+
+def test_parallel_generation_matches_serial():
+    serial, _, labels = DataGenerator(seed=7).generate_hyperspectral_seed(n_samples=150, dtype=np.float32)
+    parallel, _, parallel_labels = DataGenerator(seed=7).generate_parallel('hyperspectral_seed', 150, workers=2,
+                                                                           dtype=np.float32)
+
+    np.testing.assert_array_equal(parallel, serial)
+    np.testing.assert_array_equal(parallel_labels['fungal_presence'], labels['fungal_presence'])
+    assert len(DataGenerator(seed=7).generate_parallel('hyperspectral_seed', 0)[0]) == 0
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from src.data.data_generator import DataGenerator
+from src.data.spectral_preprocessing import SpectralPreprocessor
+
+
+@pytest.fixture(scope='module')
+def seed_spectra():
+    spectra, wavelengths, _ = DataGenerator(seed=3).generate_hyperspectral_seed(n_samples=45)
+    return spectra, wavelengths
+
+
+def test_pca_uses_short_chunks(seed_spectra):
+    spectra, wavelengths = seed_spectra
+    # Chunks of 8 rows (< n_components) and a 5-row remainder
+    prep = SpectralPreprocessor(n_components=10, chunk_size=8).fit(spectra, wavelengths)
+
+    assert prep.transform(spectra).shape == (45, 10)
+
+
+def test_pca_needs_at_least_n_components_spectra(seed_spectra):
+    spectra, wavelengths = seed_spectra
+
+    with pytest.raises(ValueError, match='n_components'):
+        SpectralPreprocessor(n_components=20).fit(spectra[:12], wavelengths)
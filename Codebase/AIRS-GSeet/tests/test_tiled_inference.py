@@ -0,0 +1,36 @@
+import numpy as np
+import torch
+import torch.nn as nn
+
+from src.models.tiled_inference import TiledCanopyInference
+
+
+class _MeanIntensity(nn.Module):
+    """Two-class 'classifier' whose class-1 logit is the tile's mean intensity."""
+
+    def forward(self, x):
+        mean = x.mean(dim=(1, 2, 3))
+        return torch.stack([torch.zeros_like(mean), mean], dim=1)
+
+
+def test_every_cell_is_covered_when_size_is_not_a_multiple_of_cell_size():
+    raster = np.ones((700, 900, 3), dtype=np.float32)
+    inference = TiledCanopyInference(_MeanIntensity(), tile_size=64, overlap=16, cell_size=16, batch_size=8)
+
+    logits = inference.predict(raster)
+
+    assert logits.shape == (2, 44, 57)
+    assert (logits[1] > 0).all()
+
+
+def test_edge_tiles_land_on_their_own_cells():
+    # Only the last, partial cell column (pixels 896..899) is bright
+    raster = np.zeros((64, 900, 3), dtype=np.float32)
+    raster[:, 896:] = 1
+    inference = TiledCanopyInference(_MeanIntensity(), tile_size=64, overlap=0, cell_size=16, blend='uniform')
+
+    logits = inference.predict(raster)
+
+    assert logits[1, :, -1].min() > 0
+    # The tile covering the bright column spans the last four cells only
+    np.testing.assert_array_equal(logits[1, :, :-4], 0)